@@ -0,0 +1,168 @@
+"""
+Benchmark: blocking per-call HTTP vs the pooled async ResendClient under concurrent load
+
+Starts a local fake Resend server (HTTP/1.1, keep-alive, fixed service latency)
+and sends the same batch of signup-confirmation emails through:
+
+- "blocking": a fresh urllib connection per email on a worker thread, which is
+  what the Resend SDK does through ``asyncio.to_thread``
+- "pooled": ResendClient's shared keep-alive connection pool
+
+Run from the backend directory:
+
+    python benchmarks/bench_email_transport.py [--emails 1000] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resend_client import ResendClient  # noqa: E402
+
+EMAIL = {
+    "from": "Peptide Professor <noreply@peptideprofessor.com>",
+    "to": ["researcher@example.com"],
+    "subject": "Confirm your subscription to Peptide Professor",
+    "html": "<p>" + "Confirm your subscription. " * 40 + "</p>",
+}
+
+
+class FakeResendServer:
+    """Minimal keep-alive HTTP server answering POST /emails after ``latency`` seconds
+
+    Runs in its own process so it doesn't compete with the client for the GIL.
+    ``connections`` counts TCP connections accepted since the last reset.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connection_count = multiprocessing.Value("i", 0)
+        self.port_queue = multiprocessing.Queue()
+
+    @property
+    def connections(self) -> int:
+        return self.connection_count.value
+
+    def reset_connections(self) -> None:
+        self.connection_count.value = 0
+
+    async def handle(self, reader, writer):
+        with self.connection_count.get_lock():
+            self.connection_count.value += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                keep_alive = True
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                    elif name.strip().lower() == "connection" and value.strip().lower() == "close":
+                        keep_alive = False
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                body = b'{"id":"fake-email-id"}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n".encode()
+                    + (b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n")
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0, backlog=1024)
+        self.port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    def start(self) -> str:
+        multiprocessing.Process(target=self.run, daemon=True).start()
+        return f"http://127.0.0.1:{self.port_queue.get()}"
+
+
+def blocking_send(base_url, params):
+    request = urllib.request.Request(
+        f"{base_url}/emails",
+        data=json.dumps(params).encode(),
+        headers={"Authorization": "Bearer test", "Content-Type": "application/json", "Connection": "close"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+async def run_load(send, emails, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await send(EMAIL)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(emails)))
+    return latencies, time.perf_counter() - started
+
+
+def report(name, latencies, elapsed, connections):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(
+        f"{name:<10}{statistics.median(latencies) * 1000:>10.1f}{p99 * 1000:>10.1f}"
+        f"{len(latencies) / elapsed:>12.0f}{connections:>14,}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake server service time")
+    args = parser.parse_args()
+
+    server = FakeResendServer(args.latency_ms / 1000)
+    base_url = server.start()
+
+    print(f"{'transport':<10}{'p50 ms':>10}{'p99 ms':>10}{'emails/s':>12}{'connections':>14}")
+
+    latencies, elapsed = await run_load(
+        lambda params: asyncio.to_thread(blocking_send, base_url, params), args.emails, args.concurrency
+    )
+    report("blocking", latencies, elapsed, server.connections)
+
+    client = ResendClient("test", base_url=base_url, max_connections=args.concurrency)
+    # The app keeps one client for its whole lifetime, so measure a warm pool
+    await run_load(client.send, args.concurrency, args.concurrency)
+    server.reset_connections()
+    latencies, elapsed = await run_load(client.send, args.emails, args.concurrency)
+    await client.close()
+    report("pooled", latencies, elapsed, server.connections)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
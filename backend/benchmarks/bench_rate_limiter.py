@@ -0,0 +1,100 @@
+"""
+Microbenchmark: per-call cost and memory of the rate limiter under many distinct IPs
+
+Compares the sliding-window-counter RateLimiter with the list-of-timestamps
+limiter it replaced. Run from the backend directory:
+
+    python benchmarks/bench_rate_limiter.py [--clients 1000000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import RateLimiter  # noqa: E402
+
+
+class ListRateLimiter:
+    """The previous implementation, kept here only for comparison"""
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+        self.window_size = 60
+        self.max_requests = 60
+
+    def is_allowed(self, identifier, now=None):
+        now = time.time() if now is None else now
+        self.requests[identifier] = [
+            req_time for req_time in self.requests[identifier]
+            if now - req_time < self.window_size
+        ]
+        if len(self.requests[identifier]) < self.max_requests:
+            self.requests[identifier].append(now)
+            return True
+        return False
+
+
+def ip_for(n):
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def run_distinct(limiter, identifiers):
+    start_time = 1_700_000_000.0
+    step = 30.0 / len(identifiers)
+    for n, identifier in enumerate(identifiers):
+        limiter.is_allowed(identifier, start_time + n * step)
+
+
+def bench_distinct(factory, clients):
+    """One request from each of ``clients`` distinct IPs, all inside a single minute
+
+    Timing and memory are measured in separate runs because tracemalloc slows
+    every allocation down.
+    """
+    identifiers = [ip_for(n) for n in range(clients)]
+
+    limiter = factory()
+    gc.collect()
+    started = time.perf_counter()
+    run_distinct(limiter, identifiers)
+    per_call = (time.perf_counter() - started) / clients * 1e9
+    del limiter
+
+    limiter = factory()
+    gc.collect()
+    tracemalloc.start()
+    run_distinct(limiter, identifiers)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call, memory, len(limiter.requests)
+
+
+def bench_hot_key(limiter, calls):
+    """A single client hammering the limiter: the steady-state cost of a check"""
+    now = 1_700_000_000.0
+    started = time.perf_counter()
+    for n in range(calls):
+        limiter.is_allowed("203.0.113.7", now + n * 0.001)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    parser.add_argument("--hot-calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'limiter':<22}{'distinct ns/call':>18}{'memory MiB':>12}{'keys kept':>12}{'hot-key ns/call':>17}")
+    for name, factory in (("sliding-window counter", RateLimiter), ("list of timestamps", ListRateLimiter)):
+        per_call, memory, keys = bench_distinct(factory, args.clients)
+        hot = bench_hot_key(factory(), args.hot_calls)
+        print(f"{name:<22}{per_call:>18.0f}{memory / 2**20:>12.1f}{keys:>12,}{hot:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: translating blog posts as one blob vs sentence segments over a translation memory
+
+Translates every post in blog_content/ through a local stub DeepL server, then
+edits one paragraph per post and translates again, in two modes:
+
+- "blob": one cache entry per whole post, as /api/translate used to work
+- "segmented": translation_segments.translate_segmented over a TranslationCache and
+  TranslationBatcher, the same code path /api/translate runs
+
+Reports the DeepL requests and characters each pass costs. Run from the backend directory:
+
+    python benchmarks/bench_segmented_translation.py [--latency-ms 30]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_translation_batching import StubDeepLServer  # noqa: E402
+from deepl_client import DeepLClient  # noqa: E402
+from translation_batcher import TranslationBatcher  # noqa: E402
+from translation_cache import TranslationCache  # noqa: E402
+from translation_segments import translate_segmented  # noqa: E402
+
+BLOG_CONTENT_DIR = Path(__file__).resolve().parent.parent.parent / "blog_content"
+
+
+def edit_one_paragraph(post: str) -> str:
+    paragraphs = post.split("\n\n")
+    middle = len(paragraphs) // 2
+    paragraphs[middle] += " This sentence was added in an edit."
+    return "\n\n".join(paragraphs)
+
+
+async def translate_blob(translate, cache, text):
+    cached = await cache.get(text, "DE")
+    if cached is None:
+        cached = (await translate([text], "DE"))[0]
+        await cache.put(text, "DE", cached)
+    return cached["text"]
+
+
+async def run_pass(name, translate, posts, server, sent_chars):
+    server.reset()
+    sent_chars[0] = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(translate(post) for post in posts))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22}{server.requests:>14,}{server.texts:>10,}{sent_chars[0]:>14,}{elapsed * 1000:>12.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="stub server service time")
+    args = parser.parse_args()
+
+    posts = [path.read_text(encoding="utf-8") for path in sorted(BLOG_CONTENT_DIR.glob("*.md"))]
+    edited = [edit_one_paragraph(post) for post in posts]
+    server = StubDeepLServer(args.latency_ms / 1000)
+    client = DeepLClient("test", base_url=server.start())
+    sent_chars = [0]
+
+    async def counted(texts, target_lang):
+        sent_chars[0] += sum(len(text) for text in texts)
+        return await client.translate(texts, target_lang)
+
+    print(f"{len(posts)} posts, {sum(map(len, posts)):,} characters")
+    print(f"{'pass':<22}{'DeepL calls':>14}{'texts':>10}{'characters':>14}{'wall ms':>12}")
+
+    blob_cache = TranslationCache()
+    blob = lambda text: translate_blob(counted, blob_cache, text)  # noqa: E731
+    await run_pass("blob, first", blob, posts, server, sent_chars)
+    await run_pass("blob, after edit", blob, edited, server, sent_chars)
+
+    segment_cache = TranslationCache()
+
+    async def counted_and_cached(texts, target_lang):
+        # Same write-back as server.translate_and_cache
+        translations = await counted(texts, target_lang)
+        await segment_cache.put_many(texts, target_lang, translations)
+        return translations
+
+    batcher = TranslationBatcher(counted_and_cached)
+    segmented = lambda text: translate_segmented(text, "DE", segment_cache, batcher.translate)  # noqa: E731
+    await run_pass("segmented, first", segmented, posts, server, sent_chars)
+    await run_pass("segmented, after edit", segmented, edited, server, sent_chars)
+    print(f"translation memory: {segment_cache.metrics()}")
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,253 @@
+"""
+Benchmark: per-check cost and failure behaviour of the shared rate limit backends
+
+Measures ``await limiter.check()`` for the in-process RateLimiter, SQLiteRateLimiter
+on a temporary file (with its default local window synced every 100 ms, and with
+``sync_interval=0``, one transaction per check), and RedisRateLimiter against
+FakeRedis, an in-process stand-in for ``redis.asyncio`` (so its numbers are the
+limiter's own overhead plus an optional simulated round trip, not a real server;
+asyncio's timer resolution rounds very short simulated round trips up). Then
+checks that:
+
+- several processes sharing one SQLite file enforce one combined limit, exactly
+  with ``sync_interval=0`` and within the documented overshoot otherwise
+- a SQLite write lock held by another connection doesn't stall the event loop
+  and checks carry on from the in-process counts
+- an unreachable Redis falls back the same way
+
+With ``--redis-url`` it also runs RedisRateLimiter against that real server and
+checks the pipeline results and the DECR-on-deny rollback (needs the ``redis``
+package). Run from the backend directory:
+
+    python benchmarks/bench_shared_rate_limiters.py [--checks 5000] [--redis-rtt-ms 0.2] [--redis-url URL]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import RateLimiter, RedisRateLimiter, SQLiteRateLimiter  # noqa: E402
+
+
+class FakePipeline:
+    """Queues GET/INCR/EXPIRE like a non-transactional redis.asyncio pipeline"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    def incr(self, key):
+        self.commands.append(("incr", key))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    async def execute(self):
+        await self.client.round_trip()
+        return [getattr(self.client, f"_{name}")(*args) for name, *args in self.commands]
+
+
+class FakeRedis:
+    """Just enough of ``redis.asyncio.Redis`` for RedisRateLimiter
+
+    ``rtt`` seconds are awaited per round trip; ``down=True`` makes every call
+    raise ConnectionError, as an unreachable server would.
+    """
+
+    def __init__(self, rtt: float = 0.0):
+        self.rtt = rtt
+        self.down = False
+        self.values = {}
+        self.expiry = {}
+        self.round_trips = 0
+
+    async def round_trip(self):
+        if self.down:
+            raise ConnectionError("Connection refused")
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _get(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+        return self.values.get(key)
+
+    def _incr(self, key):
+        self.values[key] = int(self._get(key) or 0) + 1
+        return self.values[key]
+
+    def _expire(self, key, seconds):
+        self.expiry[key] = time.time() + seconds
+        return True
+
+    async def decr(self, key):
+        await self.round_trip()
+        self.values[key] = int(self._get(key) or 0) - 1
+        return self.values[key]
+
+
+async def time_checks(limiter, checks):
+    """Median and p99 microseconds per check, over ``checks`` distinct clients"""
+    latencies = []
+    for n in range(checks):
+        started = time.perf_counter()
+        await limiter.check(f"10.0.{n >> 8 & 255}.{n & 255}")
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return statistics.median(latencies) * 1e6, latencies[int(0.99 * (len(latencies) - 1))] * 1e6
+
+
+async def allowed_of(limiter, calls, identifier="203.0.113.7"):
+    return sum([await limiter.check(identifier) for _ in range(calls)])
+
+
+async def paced_allowed_of(limiter, calls, interval, identifier="203.0.113.7"):
+    allowed = 0
+    for _ in range(calls):
+        allowed += await limiter.check(identifier)
+        await asyncio.sleep(interval)
+    if limiter.syncing is not None:
+        await limiter.syncing
+    return allowed
+
+
+def sqlite_worker(path, calls, sync_interval, allowed):
+    limiter = SQLiteRateLimiter(path, max_requests=60, busy_timeout=1.0, sync_interval=sync_interval)
+    count = asyncio.run(paced_allowed_of(limiter, calls, 0.005))
+    with allowed.get_lock():
+        allowed.value += count
+
+
+def run_sqlite_workers(path, processes, calls, sync_interval):
+    SQLiteRateLimiter(path)
+    allowed = multiprocessing.Value("i", 0)
+    workers = [multiprocessing.Process(target=sqlite_worker, args=(path, calls, sync_interval, allowed))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return allowed.value
+
+
+async def check_real_redis(url):
+    import redis.asyncio as redis
+
+    client = redis.from_url(url)
+    limiter = RedisRateLimiter(client=client, key_prefix=f"ratelimit-bench-{os.getpid()}-{time.time_ns()}")
+    identifier = "203.0.113.9"
+    p50, p99 = await time_checks(RedisRateLimiter(client=client, key_prefix=limiter.key_prefix + "-timing"), 1000)
+    allowed = await allowed_of(limiter, 100, identifier)
+    window = int(time.time() // limiter.window_size)
+    stored = int(await client.get(f"{limiter.key_prefix}:{identifier}:{window}") or 0)
+    ttl = await client.ttl(f"{limiter.key_prefix}:{identifier}:{window}")
+    print(f"\nreal Redis at {url}: p50 {p50:.1f} us, p99 {p99:.1f} us per check; "
+          f"{allowed} of 100 allowed, stored count {stored} after 40 denials (DECR on deny leaves {allowed}), "
+          f"TTL {ttl} s")
+    await client.aclose()
+
+
+async def measure_loop_stall(operation):
+    """Run ``operation`` next to a 1 ms ticker; return its result, duration and the longest tick gap"""
+    gaps = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    result = await operation()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticking
+    return result, elapsed, max(gaps)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--redis-rtt-ms", type=float, default=0.2, help="simulated Redis round trip")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--redis-url", help="also check RedisRateLimiter against this real server")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="rate-limit-bench-")
+
+    limiters = (
+        ("memory", lambda: RateLimiter()),
+        ("sqlite (sync 100 ms)", lambda: SQLiteRateLimiter(tempfile.mktemp(suffix=".sqlite3", dir=directory))),
+        ("sqlite (per check)",
+         lambda: SQLiteRateLimiter(tempfile.mktemp(suffix=".sqlite3", dir=directory), sync_interval=0)),
+        ("redis (fake, 0 ms)", lambda: RedisRateLimiter(client=FakeRedis())),
+        (f"redis (fake, {args.redis_rtt_ms:g} ms)", lambda: RedisRateLimiter(client=FakeRedis(args.redis_rtt_ms / 1000))),
+    )
+    print(f"{'backend':<22}{'p50 us/check':>14}{'p99 us/check':>14}{'allowed of 100':>16}")
+    for name, factory in limiters:
+        p50, p99 = await time_checks(factory(), args.checks)
+        print(f"{name:<22}{p50:>14.1f}{p99:>14.1f}{await allowed_of(factory(), 100):>16}")
+
+    print()
+    for sync_interval in (0, 0.1):
+        path = os.path.join(directory, f"shared-{sync_interval}.sqlite3")
+        allowed = run_sqlite_workers(path, args.processes, 50, sync_interval)
+        print(f"{args.processes} processes x 50 checks (every 5 ms) on one SQLite file, sync_interval={sync_interval:g}: "
+              f"{allowed} allowed (limit 60)")
+
+    for sync_interval in (0, 0.1):
+        path = os.path.join(directory, f"locked-{sync_interval}.sqlite3")
+        limiter = SQLiteRateLimiter(path, sync_interval=sync_interval)
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+
+        async def check_and_sync():
+            result = await limiter.check("198.51.100.1")
+            if limiter.syncing is not None:
+                await limiter.syncing
+            return result
+
+        result, elapsed, stall = await measure_loop_stall(check_and_sync)
+        holder.execute("ROLLBACK")
+        print(f"SQLite write-locked elsewhere, sync_interval={sync_interval:g}: check (and sync) -> {result} in "
+              f"{elapsed * 1000:.1f} ms, longest event loop stall {stall * 1000:.1f} ms, "
+              f"local keys {len(limiter.local.requests)}, unsynced requests {sum(limiter.pending.values())}")
+
+    fake = FakeRedis()
+    limiter = RedisRateLimiter(client=fake)
+    fake.down = True
+    result, elapsed, stall = await measure_loop_stall(lambda: limiter.check("198.51.100.1"))
+    print(f"Redis unreachable: check -> {result} in {elapsed * 1000:.2f} ms, "
+          f"fallback keys {len(limiter.fallback.requests)}")
+
+    if args.redis_url:
+        await check_real_redis(args.redis_url)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark: one DeepL call per request vs single-flight coalescing plus micro-batching
+
+Starts a local stub DeepL server (HTTP/1.1, keep-alive, fixed service latency
+per request) and fires a burst of concurrent /api/translate-style requests drawn
+from a small set of strings, as when a new locale page goes live, through:
+
+- "direct": DeepLClient.translate with one text per request
+- "batched": TranslationBatcher in front of the same client
+
+Run from the backend directory:
+
+    python benchmarks/bench_translation_batching.py [--requests 2000] [--distinct 200] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deepl_client import DeepLClient  # noqa: E402
+from translation_batcher import TranslationBatcher  # noqa: E402
+
+
+class StubDeepLServer:
+    """Minimal keep-alive HTTP server answering POST /v2/translate after ``latency`` seconds
+
+    Echoes each ``text`` back prefixed with the target language. Runs in its own
+    process; ``requests`` and ``texts`` count what it received since the last reset.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.request_count = multiprocessing.Value("i", 0)
+        self.text_count = multiprocessing.Value("i", 0)
+        self.port_queue = multiprocessing.Queue()
+
+    @property
+    def requests(self) -> int:
+        return self.request_count.value
+
+    @property
+    def texts(self) -> int:
+        return self.text_count.value
+
+    def reset(self) -> None:
+        self.request_count.value = 0
+        self.text_count.value = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                form = parse_qs((await reader.readexactly(length)).decode("utf-8")) if length else {}
+                texts = form.get("text", [])
+                target_lang = form.get("target_lang", ["EN"])[0]
+                with self.request_count.get_lock():
+                    self.request_count.value += 1
+                with self.text_count.get_lock():
+                    self.text_count.value += len(texts)
+                await asyncio.sleep(self.latency)
+                body = json.dumps({"translations": [
+                    {"detected_source_language": "EN", "text": f"[{target_lang}] {text}"} for text in texts
+                ]}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n".encode()
+                    + b"Connection: keep-alive\r\n\r\n"
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0, backlog=1024)
+        self.port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    def start(self) -> str:
+        multiprocessing.Process(target=self.run, daemon=True).start()
+        return f"http://127.0.0.1:{self.port_queue.get()}"
+
+
+async def run_load(translate, texts, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with semaphore:
+            started = time.perf_counter()
+            translation = await translate(text, "DE")
+            assert translation["text"] == f"[DE] {text}"
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    return latencies, time.perf_counter() - started
+
+
+def report(name, latencies, elapsed, server):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(
+        f"{name:<10}{statistics.median(latencies) * 1000:>10.1f}{p99 * 1000:>10.1f}"
+        f"{len(latencies) / elapsed:>14.0f}{server.requests:>16,}{server.texts:>12,}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=200, help="distinct strings in the burst")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="stub server service time")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="batching window")
+    args = parser.parse_args()
+
+    server = StubDeepLServer(args.latency_ms / 1000)
+    base_url = server.start()
+    rng = random.Random(1)
+    strings = [f"Safety note {i}: consult a healthcare provider before use." for i in range(args.distinct)]
+    burst = [rng.choice(strings) for _ in range(args.requests)]
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'requests/s':>14}{'DeepL calls':>16}{'texts':>12}")
+
+    client = DeepLClient("test", base_url=base_url, max_connections=20)
+
+    async def direct(text, target_lang):
+        return (await client.translate([text], target_lang))[0]
+
+    # The app keeps one client for its whole lifetime, so measure a warm pool
+    await run_load(direct, strings[:20], 20)
+
+    server.reset()
+    latencies, elapsed = await run_load(direct, burst, args.concurrency)
+    report("direct", latencies, elapsed, server)
+
+    batcher = TranslationBatcher(client.translate, window=args.window_ms / 1000)
+    server.reset()
+    latencies, elapsed = await run_load(batcher.translate, burst, args.concurrency)
+    report("batched", latencies, elapsed, server)
+    print(f"batcher: {batcher.metrics()}")
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""
+Blog markdown content cache for Peptide Professor API
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults to the repo's blog_content/ folder next to backend/ (/app/blog_content when deployed)
+DEFAULT_BLOG_CONTENT_DIR = Path(__file__).resolve().parent.parent / "blog_content"
+
+SLUG_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+class BlogContentCache:
+    """LRU cache of blog markdown, bounded by total size and revalidated against file mtime
+
+    All filesystem access (stat and read) runs in a worker thread so the event loop
+    never blocks on disk. A cached entry is re-stat'ed at most once per
+    ``revalidate_interval`` seconds.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 8 * 1024 * 1024, revalidate_interval: float = 2.0):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.revalidate_interval = revalidate_interval
+        # slug -> (mtime_ns, checked_at, size in bytes, content)
+        self.entries: "OrderedDict[str, Tuple[int, float, int, str]]" = OrderedDict()
+        self.total_bytes = 0
+
+    def path_for(self, slug: str) -> Optional[Path]:
+        if not SLUG_PATTERN.match(slug):
+            return None
+        return self.directory / f"{slug}.md"
+
+    @staticmethod
+    def _stat_mtime(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read(path: Path) -> Tuple[int, str]:
+        with open(path, 'r', encoding='utf-8') as f:
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            return mtime_ns, f.read()
+
+    def _store(self, slug: str, mtime_ns: int, content: str) -> None:
+        self._evict(slug)
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        self.entries[slug] = (mtime_ns, time.monotonic(), size, content)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._evict(oldest)
+
+    def _evict(self, slug: str) -> None:
+        entry = self.entries.pop(slug, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    async def get(self, slug: str) -> Optional[str]:
+        """Markdown for ``slug``, or None if there is no such file"""
+        path = self.path_for(slug)
+        if path is None:
+            return None
+
+        entry = self.entries.get(slug)
+        if entry is not None:
+            mtime_ns, checked_at, size, content = entry
+            if time.monotonic() - checked_at < self.revalidate_interval:
+                self.entries.move_to_end(slug)
+                return content
+            current_mtime = await asyncio.to_thread(self._stat_mtime, path)
+            if current_mtime == mtime_ns:
+                self.entries[slug] = (mtime_ns, time.monotonic(), size, content)
+                self.entries.move_to_end(slug)
+                return content
+            if current_mtime is None:
+                self._evict(slug)
+                return None
+
+        try:
+            mtime_ns, content = await asyncio.to_thread(self._read, path)
+        except FileNotFoundError:
+            self._evict(slug)
+            return None
+        self._store(slug, mtime_ns, content)
+        return content
+
+    async def stream(self, slug: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Optional[AsyncIterator[bytes]]:
+        """UTF-8 chunks of the markdown for ``slug``, or None if there is no such file
+
+        Posts that fit in the cache are sliced from memory; posts too large to ever be
+        cached are read from disk chunk by chunk, so neither path builds the whole body.
+        """
+        path = self.path_for(slug)
+        if path is None:
+            return None
+        try:
+            size = await asyncio.to_thread(lambda: path.stat().st_size)
+        except FileNotFoundError:
+            return None
+
+        if size > self.max_bytes:
+            return self._stream_file(path, chunk_size)
+
+        content = await self.get(slug)
+        if content is None:
+            return None
+        return self._stream_text(content, chunk_size)
+
+    @staticmethod
+    async def _stream_text(content: str, chunk_size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size].encode('utf-8')
+
+    @staticmethod
+    async def _stream_file(path: Path, chunk_size: int) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, path, 'rb')
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def preload(self) -> int:
+        """Load every markdown file in the content directory; returns the number cached"""
+        paths = await asyncio.to_thread(lambda: sorted(self.directory.glob("*.md")))
+        loaded = 0
+        for path in paths:
+            if await self.get(path.stem) is not None:
+                loaded += 1
+        logger.info(f"Blog content cache loaded {loaded} posts from {self.directory}")
+        return loaded
+
+
+blog_content_cache = BlogContentCache(
+    Path(os.environ.get("BLOG_CONTENT_DIR", DEFAULT_BLOG_CONTENT_DIR)),
+    max_bytes=int(os.environ.get("BLOG_CONTENT_CACHE_BYTES", 8 * 1024 * 1024)),
+)
@@ -0,0 +1,196 @@
+"""
+Bounded calculation history for Peptide Professor API
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = re.compile(r"^calculations-(\d+)\.jsonl$")
+
+
+class CalculationStore:
+    """Calculation records kept for ``ttl`` seconds, at most ``capacity`` of them in memory
+
+    Memory is an insertion-ordered ring: the oldest record is dropped when the store
+    is full, and expired records are dropped from the front as new ones arrive.
+
+    With ``spill_dir`` set, records pushed out of memory by the capacity limit are
+    appended to JSONL segment files instead of being lost, so share links keep
+    working for the full TTL. Only an id -> (segment, offset) index stays in
+    memory, a few hundred bytes per spilled record, capped at ``max_spilled``
+    entries (the oldest spilled records become unreachable past that). Segments
+    whose newest record has expired are deleted, and the index is rebuilt from
+    the remaining segments on startup. Segment reads and writes run in a worker
+    thread, off the event loop.
+    """
+
+    def __init__(self, capacity: int = 10_000, ttl: float = 7 * 24 * 3600, spill_dir: Optional[str] = None,
+                 segment_bytes: int = 16 * 1024 * 1024, max_spilled: int = 200_000):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.segment_bytes = segment_bytes
+        self.max_spilled = max_spilled
+        # Guards the spill index and segment files, which worker threads touch
+        self.lock = threading.Lock()
+        # Records evicted from memory whose spill write hasn't finished yet
+        self.spilling: Dict[str, Dict[str, Any]] = {}
+        # calc id -> (segment number, byte offset, expires_at), oldest first
+        self.spill_index: "OrderedDict[str, Tuple[int, int, float]]" = OrderedDict()
+        # segment number -> expires_at of the newest record in it
+        self.segment_expiry: Dict[int, float] = {}
+        self.segment = 0
+        self.segment_file = None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self._load_segments()
+
+    async def add(self, calc_id: str, record: Dict[str, Any], now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self._expire(now)
+        record = dict(record, expires_at=now + self.ttl)
+        self.records[calc_id] = record
+        evicted = []
+        while len(self.records) > self.capacity:
+            evicted.append(self.records.popitem(last=False))
+        if evicted and self.spill_dir is not None:
+            self.spilling.update(evicted)
+            try:
+                await asyncio.to_thread(self._spill, evicted, now)
+            finally:
+                for evicted_id, _ in evicted:
+                    self.spilling.pop(evicted_id, None)
+
+    async def get(self, calc_id: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The stored record with ``expires_at`` as an ISO timestamp, or None if unknown or expired"""
+        now = time.time() if now is None else now
+        record = self.records.get(calc_id) or self.spilling.get(calc_id)
+        if record is None and calc_id in self.spill_index:
+            record = await asyncio.to_thread(self._read_spilled, calc_id, now)
+        if record is None or record['expires_at'] <= now:
+            return None
+        return dict(record, expires_at=datetime.utcfromtimestamp(record['expires_at']).isoformat())
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.segment_file is not None:
+                self.segment_file.close()
+                self.segment_file = None
+
+    def _expire(self, now: float) -> None:
+        while self.records:
+            oldest_id = next(iter(self.records))
+            if self.records[oldest_id]['expires_at'] > now:
+                break
+            del self.records[oldest_id]
+
+    def _expire_spilled(self, now: float) -> None:
+        """Drop expired index entries and delete fully expired segments; call with ``lock`` held"""
+        while self.spill_index:
+            oldest_id = next(iter(self.spill_index))
+            if self.spill_index[oldest_id][2] > now:
+                break
+            del self.spill_index[oldest_id]
+        for segment, expires_at in list(self.segment_expiry.items()):
+            if expires_at <= now and segment != self.segment:
+                self._segment_path(segment).unlink(missing_ok=True)
+                del self.segment_expiry[segment]
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.spill_dir / f"calculations-{segment}.jsonl"
+
+    def _spill(self, evicted: List[Tuple[str, Dict[str, Any]]], now: float) -> None:
+        """Append evicted records to the current segment; runs in a worker thread"""
+        with self.lock:
+            self._expire_spilled(now)
+            for calc_id, record in evicted:
+                try:
+                    if self.segment_file is None or self.segment_file.tell() >= self.segment_bytes:
+                        if self.segment_file is not None:
+                            self.segment_file.close()
+                            self.segment += 1
+                        self.segment_file = open(self._segment_path(self.segment), 'ab')
+                    offset = self.segment_file.tell()
+                    self.segment_file.write(json.dumps({"id": calc_id, **record}).encode('utf-8') + b"\n")
+                except OSError as e:
+                    logger.error(f"Failed to spill calculation {calc_id} to disk: {str(e)}")
+                    continue
+                self.spill_index[calc_id] = (self.segment, offset, record['expires_at'])
+                self.segment_expiry[self.segment] = max(
+                    self.segment_expiry.get(self.segment, 0.0), record['expires_at']
+                )
+                if len(self.spill_index) > self.max_spilled:
+                    self.spill_index.popitem(last=False)
+            try:
+                if self.segment_file is not None:
+                    self.segment_file.flush()
+            except OSError as e:
+                logger.error(f"Failed to flush spilled calculations: {str(e)}")
+
+    def _read_spilled(self, calc_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """Read one spilled record back; runs in a worker thread"""
+        with self.lock:
+            location = self.spill_index.get(calc_id)
+        if location is None or location[2] <= now:
+            return None
+        segment, offset, _ = location
+        try:
+            with open(self._segment_path(segment), 'rb') as f:
+                f.seek(offset)
+                record = json.loads(f.readline())
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read spilled calculation {calc_id}: {str(e)}")
+            return None
+        record.pop("id", None)
+        return record
+
+    def _load_segments(self) -> None:
+        now = time.time()
+        segments = sorted(
+            int(match.group(1))
+            for match in (SEGMENT_PATTERN.match(path.name) for path in self.spill_dir.iterdir())
+            if match
+        )
+        for segment in segments:
+            newest = 0.0
+            with open(self._segment_path(segment), 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        if entry['expires_at'] > now:
+                            self.spill_index[entry['id']] = (segment, offset, entry['expires_at'])
+                        newest = max(newest, entry['expires_at'])
+                    except (ValueError, KeyError):
+                        pass  # torn final line from a crash
+                    offset += len(line)
+            self.segment_expiry[segment] = newest
+        # Append to a fresh segment rather than after a possibly torn line
+        self.segment = segments[-1] + 1 if segments else 0
+        while len(self.spill_index) > self.max_spilled:
+            self.spill_index.popitem(last=False)
+        self._expire_spilled(now)
+
+
+def create_calculation_store() -> CalculationStore:
+    """Build the calculation store from CALCULATION_* environment variables"""
+    return CalculationStore(
+        capacity=int(os.environ.get("CALCULATION_HISTORY_CAPACITY", 10_000)),
+        ttl=float(os.environ.get("CALCULATION_HISTORY_TTL_SECONDS", 7 * 24 * 3600)),
+        spill_dir=os.environ.get("CALCULATION_SPILL_DIR") or None,
+        max_spilled=int(os.environ.get("CALCULATION_SPILL_MAX_ENTRIES", 200_000)),
+    )
@@ -0,0 +1,351 @@
+"""
+Calculator math for Peptide Professor API
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+def reconstitute(vial_size: float, bacteriostatic_water: float, target_dose: float, dosing_type: str) -> Dict[str, Any]:
+    """Concentration, injection volume and doses per vial for one vial (``target_dose`` in mcg for mcg dosing)"""
+    concentration = vial_size / bacteriostatic_water
+    if dosing_type == "mcg":
+        concentration_mcg = concentration * 1000
+        return {
+            "concentration": round(concentration, 3),
+            "injection_volume": round(target_dose / concentration_mcg, 4),
+            "concentration_mcg": round(concentration_mcg, 0),
+            "doses_per_vial": int((vial_size * 1000) / target_dose)
+        }
+    result = {
+        "concentration": round(concentration, 3),
+        "injection_volume": round(target_dose / concentration, 4),
+        "doses_per_vial": int(vial_size / target_dose)
+    }
+    if dosing_type == "mg":
+        result["units_per_ml"] = round(concentration * 1000, 0)  # Convert to mcg/ml
+    return result
+
+
+def reconstitute_many(vial_size: Sequence[float], bacteriostatic_water: Sequence[float], target_dose: Sequence[float],
+                      dosing_types: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+    """``reconstitute`` over parallel sequences, with the arithmetic done as NumPy array operations
+
+    The expressions mirror ``reconstitute`` operation for operation so every item
+    comes out identical to a single calculation; only the final rounding and the
+    integer conversion of ``doses_per_vial`` happen per item, in Python, for the
+    same reason. Items carry the same keys as a ``CalculatorResult``; an item whose
+    inputs overflow or underflow to a non-finite result is None.
+    """
+    vial = np.asarray(vial_size, dtype=np.float64)
+    water = np.asarray(bacteriostatic_water, dtype=np.float64)
+    dose = np.asarray(target_dose, dtype=np.float64)
+    is_mcg = np.asarray(dosing_types) == "mcg"
+
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        concentration = vial / water
+        concentration_mcg = concentration * 1000
+        injection_volume = np.where(is_mcg, dose / concentration_mcg, dose / concentration)
+        doses_per_vial = np.where(is_mcg, (vial * 1000) / dose, vial / dose)
+    # mg-small results don't include the mcg/ml concentration, so only it may overflow there
+    finite = (np.isfinite(concentration) & np.isfinite(injection_volume) & np.isfinite(doses_per_vial)
+              & (np.isfinite(concentration_mcg) | (np.asarray(dosing_types) == "mg-small")))
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for dosing_type, ok, conc, conc_mcg, volume, doses in zip(
+            dosing_types, finite.tolist(), concentration.tolist(), concentration_mcg.tolist(),
+            injection_volume.tolist(), doses_per_vial.tolist()):
+        if not ok:
+            results.append(None)
+            continue
+        result: Dict[str, Optional[float]] = {
+            "concentration": round(conc, 3),
+            "injection_volume": round(volume, 4),
+            "units_per_ml": None,
+            "concentration_mcg": None,
+            # Python int, like reconstitute: exact for doses past the int64 range
+            "doses_per_vial": int(doses)
+        }
+        if dosing_type == "mcg":
+            result["concentration_mcg"] = round(conc_mcg, 0)
+        elif dosing_type == "mg":
+            result["units_per_ml"] = round(conc_mcg, 0)
+        results.append(result)
+    return results
+
+
+# Default reconstitution grids per dosing type: vial sizes (mg), water volumes (ml), doses (mcg or mg)
+DEFAULT_GRID_SPECS = {
+    "mcg": ((1, 2, 5, 10), (1, 2, 3, 5), (100, 200, 250, 300, 500, 1000)),
+    "mg-small": ((2, 5, 10), (1, 2, 3), (1, 2, 2.5, 5)),
+    "mg": ((2, 5, 10, 15, 20), (1, 2, 3), (0.25, 0.5, 1, 1.7, 2.4, 2.5, 5)),
+}
+MAX_GRID_AXIS = 20
+# Accepted (min, max) per custom grid axis; keeps every cell finite and doses_per_vial within int64
+GRID_AXIS_LIMITS = {
+    "vial_sizes": (0.01, 1000.0),
+    "water_volumes": (0.01, 100.0),
+    "doses": (0.001, 100_000.0),
+}
+SYRINGE_UNITS_PER_ML = 100  # U-100 insulin syringe
+
+
+def reconstitution_grid(dosing_type: str, vial_sizes: Sequence[float], water_volumes: Sequence[float],
+                        doses: Sequence[float]) -> Dict[str, Any]:
+    """Every vial size x water volume x dose combination, in columnar form
+
+    ``injection_volume`` and ``syringe_units`` are flat, row-major over
+    (vial, water, dose): entry ``(v * len(water_volumes) + w) * len(doses) + d``.
+    ``concentration`` is (vial, water) and ``doses_per_vial`` is (vial, dose),
+    since neither depends on the third axis. Values are rounded as ``reconstitute``
+    rounds them, so the grid agrees with the calculator.
+    """
+    dose_scale = 1000 if dosing_type == "mcg" else 1
+    vial = np.asarray(vial_sizes, dtype=np.float64)
+    water = np.asarray(water_volumes, dtype=np.float64)
+    dose = np.asarray(doses, dtype=np.float64)
+
+    concentration = vial[:, None] / water[None, :]
+    injection_volume = dose[None, None, :] / (concentration[:, :, None] * dose_scale)
+    doses_per_vial = ((vial[:, None] * dose_scale) / dose[None, :]).astype(np.int64)
+
+    return {
+        "dosing_type": dosing_type,
+        "dose_unit": "mcg" if dosing_type == "mcg" else "mg",
+        "vial_sizes": vial.tolist(),
+        "water_volumes": water.tolist(),
+        "doses": dose.tolist(),
+        "shape": [len(vial), len(water), len(dose)],
+        "concentration": [round(value, 3) for value in concentration.ravel().tolist()],
+        "injection_volume": [round(value, 4) for value in injection_volume.ravel().tolist()],
+        "syringe_units": [round(value, 1) for value in (injection_volume * SYRINGE_UNITS_PER_ML).ravel().tolist()],
+        "doses_per_vial": doses_per_vial.ravel().tolist()
+    }
+
+
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'lightly_active': 1.375,
+    'moderately_active': 1.55,
+    'very_active': 1.725,
+    'extremely_active': 1.9
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.55  # moderately active
+
+
+def activity_key(activity_level: str) -> str:
+    return activity_level.lower().replace(' ', '_')
+
+
+def bmi_metrics(age: int, sex: str, height_cm: float, weight_kg: float, activity_level: str) -> Dict[str, Any]:
+    """BMI, Mifflin-St Jeor BMR, TDEE, healthy weight range and warnings for one person"""
+    height_m = height_cm / 100
+    bmi = weight_kg / (height_m ** 2)
+
+    if bmi < 18.5:
+        bmi_category = "Underweight"
+    elif bmi < 25:
+        bmi_category = "Normal weight"
+    elif bmi < 30:
+        bmi_category = "Overweight"
+    else:
+        bmi_category = "Obese"
+
+    if sex == 'male':
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age + 5
+    else:
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age - 161
+    tdee = bmr * ACTIVITY_MULTIPLIERS.get(activity_key(activity_level), DEFAULT_ACTIVITY_MULTIPLIER)
+
+    # Healthy weight range (BMI 18.5-24.9)
+    healthy_weight_min = 18.5 * (height_m ** 2)
+    healthy_weight_max = 24.9 * (height_m ** 2)
+
+    warnings = []
+    weekly_calorie_deficit = None
+    weeks_to_healthy_bmi = None
+
+    if bmi < 18.5:
+        warnings.append("Underweight BMI may indicate nutritional deficiency. Consult healthcare provider.")
+    elif bmi >= 30:
+        warnings.append("Obese BMI increases health risks. Consider professional weight management support.")
+        # Calculate deficit to reach BMI 25
+        weight_to_lose = weight_kg - 25 * (height_m ** 2)
+        if weight_to_lose > 0:
+            weekly_calorie_deficit = 3500  # 1 lb per week
+            weeks_to_healthy_bmi = int((weight_to_lose * 2.2) * 1)  # Approximate weeks
+    elif bmi >= 25:
+        warnings.append("Overweight BMI may increase health risks. Consider gradual weight loss.")
+        weight_to_lose = weight_kg - 24.9 * (height_m ** 2)
+        if weight_to_lose > 0:
+            weekly_calorie_deficit = 2500  # 0.7 lb per week
+            weeks_to_healthy_bmi = int((weight_to_lose * 2.2) * 1.4)
+
+    if age > 65:
+        warnings.append("For adults over 65, slightly higher BMI (23-30) may be protective.")
+    if age < 18:
+        warnings.append("BMI calculations for individuals under 18 should use pediatric growth charts.")
+
+    return {
+        "bmi": round(bmi, 1),
+        "bmi_category": bmi_category,
+        "bmr": round(bmr, 0),
+        "tdee": round(tdee, 0),
+        "healthy_weight_min": round(healthy_weight_min, 1),
+        "healthy_weight_max": round(healthy_weight_max, 1),
+        "weekly_calorie_deficit": weekly_calorie_deficit,
+        "weeks_to_healthy_bmi": weeks_to_healthy_bmi,
+        "warnings": warnings
+    }
+
+
+# Base melanotan doses in mcg
+MELANOTAN_BASE_DOSES = {
+    "mt1": {"loading": 500, "maintenance": 250},
+    "mt2": {"loading": 250, "maintenance": 125}
+}
+# Higher Fitzpatrick skin types need less
+FITZPATRICK_MULTIPLIERS = {1: 1.2, 2: 1.1, 3: 1.0, 4: 0.9, 5: 0.8, 6: 0.7}
+UV_ADJUSTMENTS = {"minimal": 1.0, "moderate": 0.9, "frequent": 0.8}
+SENSITIVITY_ADJUSTMENTS = {"high": 0.7, "normal": 1.0, "low": 1.2}
+TARGET_TIMELINES = {"light": 14, "medium": 21, "dark": 35}
+MELANOTAN_SAFETY_WARNINGS = (
+    "Always use sterile injection technique",
+    "Monitor all moles and skin changes closely",
+    "Use broad-spectrum sunscreen (SPF 30+)",
+    "Start with lower doses to assess tolerance",
+    "Discontinue if unusual skin changes occur"
+)
+
+
+def melanotan_protocol(peptide: str, fitzpatrick_scale: int, uv_exposure: str, sensitivity: str,
+                       target_tan: str) -> Dict[str, Any]:
+    """Loading and maintenance melanotan protocol, red flags and timeline for one set of inputs"""
+    peptide_doses = MELANOTAN_BASE_DOSES.get(peptide, MELANOTAN_BASE_DOSES["mt2"])
+    multiplier = (FITZPATRICK_MULTIPLIERS.get(fitzpatrick_scale, 1.0) *
+                  UV_ADJUSTMENTS.get(uv_exposure, 1.0) *
+                  SENSITIVITY_ADJUSTMENTS.get(sensitivity, 1.0))
+    loading_dose = int(peptide_doses["loading"] * multiplier)
+    maintenance_dose = int(peptide_doses["maintenance"] * multiplier)
+
+    loading_duration = 7 if peptide == "mt1" else 5
+    loading_schedule = [
+        {
+            "day": day,
+            "dose": loading_dose if day <= 3 else int(loading_dose * 0.8),
+            "notes": "Loading phase" if day <= 3 else "Tapering"
+        }
+        for day in range(1, loading_duration + 1)
+    ]
+
+    red_flags = []
+    if fitzpatrick_scale <= 2 and target_tan == "dark":
+        red_flags.append("EXTREME CAUTION: Fair skin + dark tan target significantly increases cancer risk")
+    if peptide == "mt2" and sensitivity == "high":
+        red_flags.append("MT-2 with high sensitivity may cause severe nausea and flushing")
+
+    timeline_days = TARGET_TIMELINES.get(target_tan, 21)
+    if fitzpatrick_scale <= 2:
+        timeline_days += 7  # Fair skin takes longer
+
+    return {
+        "loading_phase": {
+            "daily_dose": loading_dose, "dose": None, "duration": loading_duration, "frequency": None,
+            "schedule": loading_schedule
+        },
+        "maintenance_phase": {
+            "daily_dose": None, "dose": maintenance_dose, "duration": None, "frequency": "2-3 times per week",
+            "schedule": None
+        },
+        "timeline": {"estimated_days_to_target": timeline_days},
+        "red_flags": red_flags,
+        "safety_warnings": list(MELANOTAN_SAFETY_WARNINGS)
+    }
+
+
+class ResultCache:
+    """Bounded LRU of calculator results keyed on normalized inputs, with hit/miss counters
+
+    Calculators are pure, so a result can be reused for any later request with the
+    same inputs. Cached values are shared between requests and must not be mutated;
+    per-request fields such as calculation ids are added to a copy.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self.entries[key] = value
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+BMI_CATEGORIES = np.array(["Underweight", "Normal weight", "Overweight", "Obese"])
+
+
+def bmi_metrics_many(age: np.ndarray, is_male: np.ndarray, height_cm: np.ndarray, weight_kg: np.ndarray,
+                     activity_multiplier: np.ndarray) -> Dict[str, np.ndarray]:
+    """``bmi_metrics`` over arrays of people, unrounded and without warnings
+
+    The expressions follow ``bmi_metrics`` operation for operation, so rounding
+    the results the same way (and ``int()`` on ``weeks_to_healthy_bmi``) gives
+    identical numbers. ``finite`` is False for people whose inputs overflow or
+    underflow to a non-finite result; their other values are meaningless.
+    """
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        height_m = height_cm / 100
+        height_m_squared = height_m ** 2
+        bmi = weight_kg / height_m_squared
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age + np.where(is_male, 5, -161)
+        tdee = bmr * activity_multiplier
+        obese_loss = weight_kg - 25 * height_m_squared
+        overweight_loss = weight_kg - 24.9 * height_m_squared
+        healthy_weight_min = 18.5 * height_m_squared
+        healthy_weight_max = 24.9 * height_m_squared
+        # Left as floats: the weeks are unbounded, so casting to int64 here could wrap
+        weeks_to_healthy_bmi = np.where(
+            bmi >= 30, (obese_loss * 2.2) * 1, np.where(bmi >= 25, (overweight_loss * 2.2) * 1.4, 0)
+        )
+    finite = (np.isfinite(bmi) & np.isfinite(bmr) & np.isfinite(tdee) & np.isfinite(healthy_weight_max)
+              & np.isfinite(weeks_to_healthy_bmi))
+    category = BMI_CATEGORIES[np.searchsorted(np.array([18.5, 25, 30]), bmi, side='right')]
+
+    obese = (bmi >= 30) & (obese_loss > 0)
+    overweight = (bmi >= 25) & (bmi < 30) & (overweight_loss > 0)
+    weekly_calorie_deficit = np.where(obese, 3500, np.where(overweight, 2500, 0))
+
+    return {
+        "bmi": bmi,
+        "bmi_category": category,
+        "bmr": bmr,
+        "tdee": tdee,
+        "healthy_weight_min": healthy_weight_min,
+        "healthy_weight_max": healthy_weight_max,
+        "has_target": obese | overweight,
+        "weekly_calorie_deficit": weekly_calorie_deficit,
+        "weeks_to_healthy_bmi": weeks_to_healthy_bmi,
+        "finite": finite
+    }
@@ -0,0 +1,302 @@
+"""
+Catalog indexes for Peptide Professor API
+"""
+import base64
+import hashlib
+import json
+import re
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from dosing_profile import build_dosing_profiles
+from peptide_data import get_peptide_categories, get_default_team_data
+
+# Calculators shipped by the frontend (BMI, GLP-1 dosing, reconstitution, TRT,
+# melanotan, fitness, protocol tool); these live outside the catalog data
+PROFESSIONAL_TOOLS = 7
+
+# Upper bound on memoized derived values per catalog version. Field projections
+# are client-chosen, so without a cap the number of cached variants is unbounded.
+MAX_DERIVED_ENTRIES = 256
+
+# Query parameters /api/peptides can filter on, each backed by a bitset index
+FILTER_ATTRIBUTES = ('fdaApproved', 'wadaBanned', 'category', 'researchStatus')
+BOOLEAN_VALUES = {'true': 'true', '1': 'true', 'yes': 'true', 'false': 'false', '0': 'false', 'no': 'false'}
+
+
+def _filter_key(value: str) -> str:
+    """Normalize a filter value: 'Research compound' and 'research-compound' index the same"""
+    return re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-')
+
+
+def _fingerprint(categories: Dict[str, Any]) -> Tuple:
+    """Cheap structural signature of the catalog, used to notice edits without re-walking it"""
+    return (id(categories), len(categories)) + tuple(
+        (key, id(category), id(category.get('peptides')), len(category.get('peptides', ())))
+        for key, category in categories.items()
+    )
+
+
+class CatalogIndex:
+    """Lookup tables built once from a single version of the peptide catalog"""
+
+    def __init__(self, categories: Dict[str, Any]):
+        self.categories = categories
+        self.fingerprint = _fingerprint(categories)
+        self.version = hashlib.sha256(
+            json.dumps(categories, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()[:16]
+        self.built_at = datetime.utcnow()
+        self.peptides_by_slug: Dict[str, Dict[str, Any]] = {}
+        self.category_by_slug: Dict[str, str] = {}
+        self._derived: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+        for category_key, category in categories.items():
+            for peptide in category.get('peptides', []):
+                slug = peptide.get('slug')
+                # Some peptides appear in several categories; the first listing wins,
+                # matching the order the old linear search returned them in
+                if slug and slug not in self.peptides_by_slug:
+                    self.peptides_by_slug[slug] = peptide
+                    self.category_by_slug[slug] = category_key
+
+        # Classified here, at load, so calculators look profiles up instead of re-parsing dosage text
+        self.dosing_profiles = build_dosing_profiles(self.peptides_by_slug)
+
+    def is_current(self, categories: Dict[str, Any]) -> bool:
+        return categories is self.categories and _fingerprint(categories) == self.fingerprint
+
+    def get_peptide(self, slug: str) -> Optional[Dict[str, Any]]:
+        return self.peptides_by_slug.get(slug)
+
+    def get_category_key(self, slug: str) -> Optional[str]:
+        return self.category_by_slug.get(slug)
+
+    def cached(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Memoize a value derived from this catalog version (serialized payloads, projections, ...)
+
+        Least recently used entries are evicted first, so hot responses survive a
+        stream of one-off, client-chosen variants.
+        """
+        try:
+            value = self._derived[key]
+        except KeyError:
+            pass
+        else:
+            self._derived.move_to_end(key)
+            return value
+        value = build()
+        self._derived[key] = value
+        if len(self._derived) > MAX_DERIVED_ENTRIES:
+            self._derived.popitem(last=False)
+        return value
+
+    @cached_property
+    def peptide_fields(self) -> FrozenSet[str]:
+        """Every field name used by at least one peptide record"""
+        return frozenset(field for peptide in self.iter_peptides() for field in peptide)
+
+    def iter_peptides(self):
+        """Yield every peptide listing in catalog order, including repeats across categories"""
+        for category in self.categories.values():
+            yield from category.get('peptides', [])
+
+    def normalize_fields(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Parse a comma-separated ``fields`` value into a canonical tuple usable as a cache key
+
+        Returns None when no projection was requested. Raises ValueError on unknown fields.
+        """
+        if not fields:
+            return None
+        requested = tuple(sorted({field.strip() for field in fields.split(',') if field.strip()}))
+        unknown = [field for field in requested if field not in self.peptide_fields]
+        if unknown:
+            raise ValueError(f"Unknown peptide fields: {', '.join(unknown)}")
+        return requested or None
+
+    @staticmethod
+    def project_peptide(peptide: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        if fields is None:
+            return peptide
+        return {field: peptide[field] for field in fields if field in peptide}
+
+    def project_category(self, category: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        """Category metadata with each peptide reduced to the requested fields"""
+        if fields is None:
+            return category
+        projected = {key: value for key, value in category.items() if key != 'peptides'}
+        projected['peptides'] = [self.project_peptide(peptide, fields) for peptide in category.get('peptides', [])]
+        return projected
+
+    def project_categories(self, fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        if fields is None:
+            return self.categories
+        return {key: self.project_category(category, fields) for key, category in self.categories.items()}
+
+    @cached_property
+    def peptide_ids(self) -> List[str]:
+        """Dense integer ids for bitset indexes: position ``i`` holds the slug of peptide ``i``"""
+        return list(self.peptides_by_slug)
+
+    @cached_property
+    def filter_bitsets(self) -> Dict[str, Dict[str, int]]:
+        """Per-attribute indexes mapping a normalized value to a bitset of peptide ids
+
+        ``researchStatus`` is indexed both by its full text and by the stage before the
+        dash, so ``researchStatus=research-compound`` matches every research compound.
+        """
+        bitsets: Dict[str, Dict[str, int]] = {attribute: defaultdict(int) for attribute in FILTER_ATTRIBUTES}
+        id_by_slug = {slug: peptide_id for peptide_id, slug in enumerate(self.peptide_ids)}
+
+        for category_key, category in self.categories.items():
+            for peptide in category.get('peptides', []):
+                if peptide.get('slug') in id_by_slug:
+                    bitsets['category'][category_key] |= 1 << id_by_slug[peptide['slug']]
+
+        for peptide_id, slug in enumerate(self.peptide_ids):
+            peptide = self.peptides_by_slug[slug]
+            bit = 1 << peptide_id
+            bitsets['fdaApproved']['true' if peptide.get('fdaApproved', False) else 'false'] |= bit
+            bitsets['wadaBanned']['true' if peptide.get('wadaBanned', False) else 'false'] |= bit
+            research_status = peptide.get('researchStatus')
+            if research_status:
+                bitsets['researchStatus'][_filter_key(research_status)] |= bit
+                bitsets['researchStatus'][_filter_key(research_status.split(' - ')[0])] |= bit
+
+        return {attribute: dict(index) for attribute, index in bitsets.items()}
+
+    def filter_peptide_ids(self, filters: Dict[str, Optional[str]]) -> int:
+        """Bitset of peptide ids matching every given filter
+
+        Comma-separated values within one attribute are OR-ed together. Raises
+        ValueError for boolean filters that are not true/false.
+        """
+        matched = (1 << len(self.peptide_ids)) - 1
+        for attribute, raw_value in filters.items():
+            if raw_value is None:
+                continue
+            index = self.filter_bitsets[attribute]
+            attribute_bits = 0
+            for value in raw_value.split(','):
+                if attribute in ('fdaApproved', 'wadaBanned'):
+                    key = BOOLEAN_VALUES.get(value.strip().lower())
+                    if key is None:
+                        raise ValueError(f"{attribute} must be true or false")
+                elif attribute == 'category':
+                    key = value.strip()
+                else:
+                    key = _filter_key(value)
+                attribute_bits |= index.get(key, 0)
+            matched &= attribute_bits
+        return matched
+
+    def page_peptide_ids(self, bits: int, after: Optional[int], limit: int) -> Tuple[List[int], Optional[int]]:
+        """Take up to ``limit`` ids from a bitset, starting after id ``after``
+
+        Returns the ids and the id to resume after, or None when the bitset is exhausted.
+        """
+        if after is not None:
+            bits = (bits >> (after + 1)) << (after + 1)
+        ids = []
+        while bits and len(ids) < limit:
+            lowest = bits & -bits
+            ids.append(lowest.bit_length() - 1)
+            bits ^= lowest
+        return ids, (ids[-1] if bits and ids else None)
+
+    def encode_cursor(self, after: int) -> str:
+        return base64.urlsafe_b64encode(f"{self.version}:{after}".encode('ascii')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> int:
+        """Inverse of encode_cursor; raises ValueError for malformed cursors or ones from an older catalog"""
+        try:
+            version, _, after = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii').partition(':')
+            after_id = int(after)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid cursor")
+        if version != self.version:
+            raise ValueError("Cursor refers to an older version of the catalog; restart pagination")
+        if not 0 <= after_id < len(self.peptide_ids):
+            raise ValueError("Invalid cursor")
+        return after_id
+
+    @cached_property
+    def statistics(self) -> Dict[str, Any]:
+        """Platform statistics for this catalog version, computed on first use"""
+        total_peptides = 0
+        total_citations = 0
+        fda_approved_count = 0
+        clinical_stage_count = 0
+        research_findings_count = 0
+
+        for peptide in self.iter_peptides():
+            total_peptides += 1
+            total_citations += len(peptide.get('citations', []))
+            research_findings_count += len(peptide.get('researchFindings', []))
+            if peptide.get('fdaApproved', False):
+                fda_approved_count += 1
+            if 'clinical trial' in peptide.get('researchStatus', '').lower():
+                clinical_stage_count += 1
+
+        medical_advisors = sum(
+            1 for member in get_default_team_data() if 'medical advisor' in member.get('title', '').lower()
+        )
+
+        return {
+            "peptides": {
+                "total": total_peptides,
+                "description": "Comprehensive peptide profiles with mechanisms, structures, safety notes, and references"
+            },
+            "citations": {
+                "total": total_citations,
+                "description": "Curated peer-reviewed studies and clinical data"
+            },
+            "tools": {
+                "total": PROFESSIONAL_TOOLS,
+                "description": "GLP-1 dosage, reconstitution, BMI and metabolic, interaction checks, and more"
+            },
+            "medical_oversight": {
+                "total": medical_advisors,
+                "description": "Board-certified physician guidance for scientific accuracy"
+            },
+            "research_studies": {
+                "total": research_findings_count,
+                "clinical_stage_peptides": clinical_stage_count,
+                "description": "Clinical trials, safety studies, and research publications"
+            },
+            "categories": {
+                "total": len(self.categories),
+                "description": "Specialized peptide categories"
+            },
+            "fda_approved": {
+                "total": fda_approved_count,
+                "description": "FDA-approved peptide therapeutics"
+            },
+            "catalog_version": self.version,
+            "last_updated": self.built_at.isoformat()
+        }
+
+
+_catalog_index = CatalogIndex(get_peptide_categories())
+
+
+def get_catalog_index() -> CatalogIndex:
+    """Return the index for the current catalog, rebuilding it if the catalog has changed
+
+    Replacing the catalog, a category or a category's peptide list is picked up
+    automatically. Call refresh_catalog_index() after editing a peptide record in place.
+    """
+    global _catalog_index
+    categories = get_peptide_categories()
+    if not _catalog_index.is_current(categories):
+        _catalog_index = CatalogIndex(categories)
+    return _catalog_index
+
+
+def refresh_catalog_index() -> CatalogIndex:
+    """Force a rebuild of the catalog index"""
+    global _catalog_index
+    _catalog_index = CatalogIndex(get_peptide_categories())
+    return _catalog_index
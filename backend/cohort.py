@@ -0,0 +1,110 @@
+"""
+BMI cohort CSV processing for Peptide Professor API
+"""
+import csv
+import io
+import math
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from calculators import ACTIVITY_MULTIPLIERS, DEFAULT_ACTIVITY_MULTIPLIER, activity_key, bmi_metrics_many
+
+COHORT_INPUT_COLUMNS = ('age', 'sex', 'height_cm', 'weight_kg', 'activity_level')
+COHORT_RESULT_COLUMNS = (
+    'bmi', 'bmi_category', 'bmr', 'tdee', 'healthy_weight_min', 'healthy_weight_max',
+    'weekly_calorie_deficit', 'weeks_to_healthy_bmi', 'error'
+)
+# Rows whose numbers overflow or underflow to a non-finite result
+OUT_OF_RANGE_ERROR = "Values are out of range"
+
+
+def open_cohort_csv(source: BinaryIO) -> csv.DictReader:
+    """Reader over an uploaded cohort CSV; raises ValueError if the header lacks an input column"""
+    reader = csv.DictReader(io.TextIOWrapper(source, encoding='utf-8-sig', newline=''))
+    columns = [column.strip() for column in reader.fieldnames or []]
+    missing = [column for column in COHORT_INPUT_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    reader.fieldnames = columns
+    return reader
+
+
+def _parse_row(row: Dict[str, str]) -> Tuple[Optional[tuple], Optional[str]]:
+    """Validate one row the way /api/calculators/bmi does; returns (values, None) or (None, error)"""
+    try:
+        age = float(row['age'])
+        height_cm = float(row['height_cm'])
+        weight_kg = float(row['weight_kg'])
+    except (TypeError, ValueError):
+        return None, "Age, height and weight must be numbers"
+    if not (math.isfinite(age) and math.isfinite(height_cm) and math.isfinite(weight_kg)) or not age.is_integer():
+        return None, "Age must be a whole number; height and weight must be finite"
+    if age <= 0 or height_cm <= 0 or weight_kg <= 0:
+        return None, "Age, height, and weight must be greater than 0"
+    sex = (row['sex'] or '').strip()
+    if sex not in ('male', 'female'):
+        return None, "Sex must be 'male' or 'female'"
+    multiplier = ACTIVITY_MULTIPLIERS.get(activity_key((row['activity_level'] or '').strip()),
+                                          DEFAULT_ACTIVITY_MULTIPLIER)
+    return (int(age), sex == 'male', height_cm, weight_kg, multiplier), None
+
+
+def stream_bmi_cohort(reader: csv.DictReader, chunk_rows: int = 4096) -> Iterator[bytes]:
+    """Yield result CSV bytes for a cohort, ``chunk_rows`` input rows at a time
+
+    Output rows echo every input column (so client ids survive) followed by the
+    results; rows that fail validation carry an ``error`` and empty results. Only
+    one chunk is held in memory, whatever the size of the upload.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([*reader.fieldnames, *COHORT_RESULT_COLUMNS])
+
+    while True:
+        rows: List[Dict[str, str]] = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_rows:
+                break
+        if not rows:
+            break
+
+        parsed = [_parse_row(row) for row in rows]
+        valid = [values for values, _ in parsed if values is not None]
+        results: Dict[str, list] = {}
+        if valid:
+            age, is_male, height_cm, weight_kg, multiplier = (np.array(column) for column in zip(*valid))
+            metrics = bmi_metrics_many(age, is_male, height_cm, weight_kg, multiplier)
+            results = {name: values.tolist() for name, values in metrics.items()}
+
+        position = 0
+        for row, (values, error) in zip(rows, parsed):
+            echoed = [row.get(column, '') for column in reader.fieldnames]
+            if values is not None:
+                index, position = position, position + 1
+                if not results['finite'][index]:
+                    values, error = None, OUT_OF_RANGE_ERROR
+            if values is None:
+                writer.writerow([*echoed, *([''] * (len(COHORT_RESULT_COLUMNS) - 1)), error])
+                continue
+            has_target = results['has_target'][index]
+            writer.writerow([
+                *echoed,
+                round(results['bmi'][index], 1),
+                results['bmi_category'][index],
+                round(results['bmr'][index], 0),
+                round(results['tdee'][index], 0),
+                round(results['healthy_weight_min'][index], 1),
+                round(results['healthy_weight_max'][index], 1),
+                float(results['weekly_calorie_deficit'][index]) if has_target else '',
+                int(results['weeks_to_healthy_bmi'][index]) if has_target else '',
+                ''
+            ])
+
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
@@ -0,0 +1,40 @@
+"""
+Async DeepL client with a persistent connection pool for Peptide Professor API
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from pooled_client import PooledAPIClient
+
+DEFAULT_DEEPL_BASE_URL = "https://api-free.deepl.com"
+
+
+class DeepLError(Exception):
+    """DeepL rejected a translation request or answered with an error status"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"DeepL API error {status_code}: {message}")
+        self.status_code = status_code
+
+
+class DeepLClient(PooledAPIClient):
+    """Translates through the DeepL REST API over a keep-alive ``httpx.AsyncClient``
+
+    Shares PooledAPIClient's app-lifetime pool handling with ResendClient.
+    """
+
+    def __init__(self, api_key: Optional[str], base_url: str = DEFAULT_DEEPL_BASE_URL, timeout: float = 10.0,
+                 max_connections: int = 20):
+        super().__init__(api_key, base_url, timeout=timeout, max_connections=max_connections)
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"DeepL-Auth-Key {self.api_key}"}
+
+    async def translate(self, texts: Sequence[str], target_lang: str) -> List[Dict[str, Any]]:
+        """Translate ``texts`` in one request; returns DeepL's translation objects in the same order"""
+        response = await self._get_client().post(
+            "/v2/translate",
+            data={"text": list(texts), "target_lang": target_lang.upper()}
+        )
+        if response.status_code != 200:
+            raise DeepLError(response.status_code, response.text)
+        return response.json()["translations"]
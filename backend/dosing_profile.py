@@ -0,0 +1,72 @@
+"""
+Dosing-profile classification for Peptide Professor API
+"""
+import re
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+MCG_DOSING_SLUGS = frozenset({
+    'ipamorelin', 'igf-1-lr3', 'bpc-157', 'cjc-1295', 'ghrp-2', 'ghrp-6', 'hexarelin', 'melanotan-ii',
+    'ghk-cu', 'ahk-cu', 'dsip', 'selank', 'semax', 'mgf', 'ara-290'
+})
+MCG_DOSING_KEYWORDS = ('ghrp', 'igf', 'bpc', 'melanotan')
+# TB-500 style peptides use mg but smaller doses
+MG_SMALL_DOSING_SLUGS = frozenset({'tb-500', 'thymosin'})
+
+# "250-500mcg", "0.25 mg", "2-2.5mg", "1 to 3 mg"; IU and other units are not convertible and are skipped
+DOSE_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(mcg|μg|mg)\b',
+    re.IGNORECASE
+)
+MCG_PER_UNIT = {'mcg': 1.0, 'μg': 1.0, 'mg': 1000.0}
+
+
+class DosingProfile(NamedTuple):
+    """How a peptide is dosed, derived once from its catalog record
+
+    ``unit_class`` is ``mcg``, ``mg-small`` (TB-500 style) or ``mg`` and selects the
+    calculator formula. ``min_dose``/``max_dose`` are the smallest and largest
+    doses mentioned in the dosage text, in ``dose_unit``; None when it names none.
+    """
+    slug: str
+    unit_class: str
+    dose_unit: str
+    min_dose: Optional[float]
+    max_dose: Optional[float]
+
+
+def classify_unit(slug: str, dosage_text: str) -> str:
+    dosage_text = dosage_text.lower()
+    if ('mcg' in dosage_text or 'μg' in dosage_text or slug in MCG_DOSING_SLUGS
+            or any(keyword in slug for keyword in MCG_DOSING_KEYWORDS)):
+        return "mcg"
+    if slug in MG_SMALL_DOSING_SLUGS:
+        return "mg-small"
+    return "mg"
+
+
+def parse_dose_range(dosage_text: str, dose_unit: str):
+    """Smallest and largest dose in free text, converted to ``dose_unit``; (None, None) if there are none"""
+    doses = []
+    for low, high, unit in DOSE_PATTERN.findall(dosage_text):
+        scale = MCG_PER_UNIT[unit.lower()] / MCG_PER_UNIT[dose_unit]
+        doses.append(float(low) * scale)
+        if high:
+            doses.append(float(high) * scale)
+    if not doses:
+        return None, None
+    return round(min(doses), 6), round(max(doses), 6)
+
+
+def build_dosing_profile(peptide: Dict[str, Any]) -> DosingProfile:
+    slug = peptide['slug']
+    dosage_text = peptide.get('dosage', '')
+    unit_class = classify_unit(slug, dosage_text)
+    dose_unit = "mcg" if unit_class == "mcg" else "mg"
+    min_dose, max_dose = parse_dose_range(dosage_text, dose_unit)
+    return DosingProfile(slug, unit_class, dose_unit, min_dose, max_dose)
+
+
+def build_dosing_profiles(peptides_by_slug: Dict[str, Dict[str, Any]]) -> Mapping[str, DosingProfile]:
+    """Read-only slug -> DosingProfile table for a catalog"""
+    return MappingProxyType({slug: build_dosing_profile(peptide) for slug, peptide in peptides_by_slug.items()})
@@ -0,0 +1,170 @@
+"""
+Background email delivery queue for Peptide Professor API
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed send is worth retrying: transport errors, 429 and 5xx
+
+    Other API errors (a bad key, an invalid recipient) fail the same way every time.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, OSError))
+
+
+class EmailJob:
+    __slots__ = ("params", "kind", "attempts", "enqueued_at")
+
+    def __init__(self, params: Dict[str, Any], kind: str):
+        self.params = params
+        self.kind = kind
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+
+class EmailQueue:
+    """In-process asyncio queue that delivers emails from worker tasks
+
+    Endpoints enqueue and return immediately. Sends that fail transiently (per
+    ``is_retryable``) are retried with exponential backoff and jitter; permanent
+    failures, jobs that exhaust ``max_attempts`` and jobs arriving while the queue
+    is full go to a bounded dead-letter list for inspection.
+    """
+
+    def __init__(self, sender: Sender, workers: int = 2, max_attempts: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 60.0, maxsize: int = 1000, dead_letter_limit: int = 500,
+                 is_retryable: Callable[[Exception], bool] = is_transient):
+        self.sender = sender
+        self.is_retryable = is_retryable
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue: Optional[asyncio.Queue] = None
+        self.maxsize = maxsize
+        self.workers: List[asyncio.Task] = []
+        self.pending_retries: set = set()
+        self.dead_letters: deque = deque(maxlen=dead_letter_limit)
+        self.latencies: deque = deque(maxlen=1000)  # seconds from enqueue to delivery
+        self.sent = 0
+        self.failed_attempts = 0
+        self.in_flight = 0
+
+    async def start(self) -> None:
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Give queued emails ``timeout`` seconds to go out, then cancel the workers"""
+        if not self.workers:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Email queue stopped with {self.queue.qsize()} emails undelivered")
+        for task in [*self.workers, *self.pending_retries]:
+            task.cancel()
+        await asyncio.gather(*self.workers, *self.pending_retries, return_exceptions=True)
+        self.workers = []
+        self.pending_retries.clear()
+
+    def enqueue(self, params: Dict[str, Any], kind: str = "email") -> bool:
+        """Queue an email for delivery; returns False if it had to be dead-lettered instead"""
+        job = EmailJob(params, kind)
+        if self.queue is None:
+            self._dead_letter(job, "Email queue is not running")
+            return False
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._dead_letter(job, "Email queue is full")
+            return False
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            self.in_flight += 1
+            try:
+                await self._deliver(job)
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    async def _deliver(self, job: EmailJob) -> None:
+        job.attempts += 1
+        try:
+            await self.sender(job.params)
+        except Exception as e:
+            self.failed_attempts += 1
+            if job.attempts >= self.max_attempts or not self.is_retryable(e):
+                self._dead_letter(job, str(e))
+                return
+            delay = min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(f"Failed to send {job.kind} email (attempt {job.attempts}), retrying in {delay:.1f}s: {str(e)}")
+            task = asyncio.create_task(self._retry_later(job, delay))
+            self.pending_retries.add(task)
+            task.add_done_callback(self.pending_retries.discard)
+            return
+
+        self.sent += 1
+        self.latencies.append(time.monotonic() - job.enqueued_at)
+        logger.info(f"{job.kind.capitalize()} email sent to {', '.join(job.params.get('to', []))}")
+
+    async def _retry_later(self, job: EmailJob, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._dead_letter(job, "Email queue is full")
+
+    def _dead_letter(self, job: EmailJob, error: str) -> None:
+        logger.error(f"Giving up on {job.kind} email to {', '.join(job.params.get('to', []))}: {error}")
+        self.dead_letters.append({
+            "kind": job.kind,
+            "to": job.params.get("to", []),
+            "subject": job.params.get("subject"),
+            "attempts": job.attempts,
+            "error": error,
+            "failed_at": datetime.utcnow().isoformat()
+        })
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 1)
+
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "in_flight": self.in_flight,
+            "pending_retries": len(self.pending_retries),
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "dead_letters": len(self.dead_letters),
+            "delivery_latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1] * 1000, 1) if latencies else None
+            }
+        }
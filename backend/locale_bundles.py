@@ -0,0 +1,285 @@
+"""
+Pre-translated catalog and blog bundles for Peptide Professor API
+
+Run as a script to (re)build the bundles offline; requests never call DeepL for them:
+
+    DEEPL_API_KEY=... python locale_bundles.py [--lang de,fr] [--output DIR] [--concurrency 4]
+
+Each locale gets ``<lang>.json`` (the bundle the API serves) and
+``<lang>.progress.jsonl`` (every translation received so far). An interrupted
+run picks up where it stopped, and after a catalog edit only new or changed
+strings are sent to DeepL.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from catalog import CatalogIndex
+from deepl_client import DeepLClient, DeepLError, DEFAULT_DEEPL_BASE_URL
+from peptide_data import get_peptide_categories, get_blog_metadata
+from translation_batcher import MAX_BATCH_TEXTS, MAX_BATCH_BYTES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUNDLE_DIR = Path(__file__).resolve().parent / "locale_bundles"
+FRONTEND_LOCALES_DIR = Path(__file__).resolve().parent.parent / "frontend" / "public" / "locales"
+SOURCE_LANG = "en"
+
+# What gets translated. Names, slugs, citations, chemistry and researchStatus (a
+# filter key) stay in English so links, search and filters work in every locale.
+CATEGORY_TEXT_FIELDS = ('title', 'description', 'status')
+PEPTIDE_TEXT_FIELDS = ('description', 'dosage', 'mechanism', 'safetyNote', 'athleteWarning')
+PEPTIDE_LIST_FIELDS = ('benefits', 'researchFindings', 'sideEffects', 'approvedFor', 'contraindications')
+BLOG_TEXT_FIELDS = ('title', 'category', 'excerpt', 'reading_time', 'meta_title', 'meta_description',
+                    'featured_image_alt')
+
+# Frontend locale -> DeepL target language where the two differ
+DEEPL_TARGET_LANGS = {'pt': 'PT-BR', 'zh': 'ZH-HANS'}
+
+MAX_ATTEMPTS = 5
+
+
+def _iter_texts(categories: Dict[str, Any], blog_posts: List[Dict[str, Any]]) -> Iterator[str]:
+    for category in categories.values():
+        for field in CATEGORY_TEXT_FIELDS:
+            yield category.get(field)
+        for peptide in category.get('peptides', []):
+            for field in PEPTIDE_TEXT_FIELDS:
+                yield peptide.get(field)
+            for field in PEPTIDE_LIST_FIELDS:
+                yield from peptide.get(field) or ()
+    for post in blog_posts:
+        for field in BLOG_TEXT_FIELDS:
+            yield post.get(field)
+
+
+def collect_texts(categories: Dict[str, Any], blog_posts: List[Dict[str, Any]]) -> List[str]:
+    """Every distinct translatable string, in catalog order"""
+    texts = _iter_texts(categories, blog_posts)
+    return list(dict.fromkeys(text for text in texts if isinstance(text, str) and text.strip()))
+
+
+def localize(categories: Dict[str, Any], blog_posts: List[Dict[str, Any]],
+             translations: Dict[str, str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Copies of the catalog and blog metadata with translatable fields replaced
+
+    Strings without a translation are kept in English.
+    """
+    def text(value):
+        return translations.get(value, value) if isinstance(value, str) else value
+
+    def translate_fields(record: Dict[str, Any], text_fields, list_fields=()) -> Dict[str, Any]:
+        localized = dict(record)
+        for field in text_fields:
+            if field in localized:
+                localized[field] = text(localized[field])
+        for field in list_fields:
+            if isinstance(localized.get(field), list):
+                localized[field] = [text(value) for value in localized[field]]
+        return localized
+
+    localized_categories = {}
+    for key, category in categories.items():
+        localized = translate_fields(category, CATEGORY_TEXT_FIELDS)
+        localized['peptides'] = [
+            translate_fields(peptide, PEPTIDE_TEXT_FIELDS, PEPTIDE_LIST_FIELDS) for peptide in category.get('peptides', [])
+        ]
+        localized_categories[key] = localized
+    return localized_categories, [translate_fields(post, BLOG_TEXT_FIELDS) for post in blog_posts]
+
+
+class LocaleBundle:
+    """One locale's translated catalog, indexed like the English one"""
+
+    def __init__(self, lang: str, data: Dict[str, Any]):
+        self.lang = lang
+        self.source_version = data.get('source_version')
+        self.generated_at = data.get('generated_at')
+        self.index = CatalogIndex(data['categories'])
+        self.blog = data.get('blog', [])
+
+
+class LocaleBundles:
+    """Bundles on disk, loaded once per process
+
+    ``preload()`` reads every bundle in ``directory`` at startup; rebuilt bundles
+    are picked up on restart or by calling ``preload()`` again.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.bundles: Dict[str, LocaleBundle] = {}
+
+    def preload(self, source_version: Optional[str] = None) -> None:
+        bundles = {}
+        for path in sorted(self.directory.glob("*.json")):
+            lang = path.stem.lower()
+            try:
+                bundles[lang] = LocaleBundle(lang, json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Could not load locale bundle {path}: {str(e)}")
+                continue
+            if source_version and bundles[lang].source_version != source_version:
+                logger.warning(f"Locale bundle {lang} was built from catalog {bundles[lang].source_version}, "
+                               f"current catalog is {source_version}; rebuild it with locale_bundles.py")
+        self.bundles = bundles
+        logger.info(f"Loaded {len(bundles)} locale bundles from {self.directory}")
+
+    def get(self, lang: str) -> Optional[LocaleBundle]:
+        return self.bundles.get(lang.lower())
+
+    @property
+    def languages(self) -> List[str]:
+        return sorted(self.bundles)
+
+
+def create_locale_bundles() -> LocaleBundles:
+    """Bundle registry for LOCALE_BUNDLE_DIR (default: backend/locale_bundles)"""
+    return LocaleBundles(Path(os.environ.get("LOCALE_BUNDLE_DIR") or DEFAULT_BUNDLE_DIR))
+
+
+def load_progress(path: Path) -> Dict[str, str]:
+    """Translations recorded by earlier runs; a line cut short by a crash is ignored"""
+    translations = {}
+    if not path.exists():
+        return translations
+    with path.open(encoding="utf-8") as progress:
+        for line in progress:
+            try:
+                entry = json.loads(line)
+                translations[entry['source']] = entry['text']
+            except (ValueError, KeyError, TypeError):
+                continue
+    return translations
+
+
+def _chunks(texts: List[str], max_texts: int = MAX_BATCH_TEXTS, max_bytes: int = MAX_BATCH_BYTES) -> Iterator[List[str]]:
+    """Split texts into DeepL-sized requests"""
+    chunk, size = [], 0
+    for text in texts:
+        text_size = len(text.encode("utf-8"))
+        if chunk and (len(chunk) >= max_texts or size + text_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += text_size
+    if chunk:
+        yield chunk
+
+
+def _write_atomic(path: Path, content: Any) -> None:
+    """Write JSON next to ``path`` and rename it into place, so readers never see half a bundle"""
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp:
+            json.dump(content, temp, ensure_ascii=False, separators=(",", ":"))
+        # mkstemp creates owner-only files; the API may run as another user
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+async def build_bundle(lang: str, client: DeepLClient, directory: Path, concurrency: int = 4) -> bool:
+    """Translate everything missing from ``lang``'s progress file, then write its bundle
+
+    At most ``concurrency`` DeepL requests are in flight. Each finished request is
+    appended to the progress file right away; failed requests are retried with
+    backoff and, if they still fail, leave the bundle unwritten (returns False)
+    so the next run retries just those strings.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    categories = get_peptide_categories()
+    blog_posts = get_blog_metadata()
+    progress_path = directory / f"{lang}.progress.jsonl"
+    translations = load_progress(progress_path)
+    missing = [text for text in collect_texts(categories, blog_posts) if text not in translations]
+    target_lang = DEEPL_TARGET_LANGS.get(lang, lang.upper())
+    logger.info(f"{lang}: {len(translations)} strings already translated, {len(missing)} to go")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    with progress_path.open("a", encoding="utf-8") as progress:
+        async def translate_chunk(chunk: List[str]) -> None:
+            nonlocal failed
+            async with semaphore:
+                for attempt in range(MAX_ATTEMPTS):
+                    try:
+                        results = await client.translate(chunk, target_lang)
+                        break
+                    except DeepLError as e:
+                        # Only rate limiting and server errors are worth retrying
+                        if not (e.status_code == 429 or e.status_code >= 500) or attempt == MAX_ATTEMPTS - 1:
+                            logger.error(f"{lang}: {len(chunk)} strings failed: {str(e)}")
+                            failed += len(chunk)
+                            return
+                    except Exception as e:
+                        if attempt == MAX_ATTEMPTS - 1:
+                            logger.error(f"{lang}: {len(chunk)} strings failed: {str(e)}")
+                            failed += len(chunk)
+                            return
+                    await asyncio.sleep(2 ** attempt)
+            for text, result in zip(chunk, results):
+                translations[text] = result['text']
+                progress.write(json.dumps({"source": text, "text": result['text']}, ensure_ascii=False) + "\n")
+            progress.flush()
+
+        await asyncio.gather(*(translate_chunk(chunk) for chunk in _chunks(missing)))
+
+    if failed:
+        logger.error(f"{lang}: {failed} strings untranslated; bundle not written, rerun to resume")
+        return False
+
+    localized_categories, localized_blog = localize(categories, blog_posts, translations)
+    _write_atomic(directory / f"{lang}.json", {
+        "lang": lang,
+        "source_version": CatalogIndex(categories).version,
+        "generated_at": datetime.utcnow().isoformat(),
+        "categories": localized_categories,
+        "blog": localized_blog
+    })
+    logger.info(f"{lang}: wrote bundle with {len(translations)} translated strings")
+    return True
+
+
+def frontend_locales() -> List[str]:
+    """Locales the frontend ships, other than the English source"""
+    if not FRONTEND_LOCALES_DIR.is_dir():
+        return []
+    return sorted(path.name for path in FRONTEND_LOCALES_DIR.iterdir() if path.is_dir() and path.name != SOURCE_LANG)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Build pre-translated catalog bundles")
+    parser.add_argument("--lang", help="comma-separated locales (default: every frontend locale)")
+    parser.add_argument("--output", type=Path, default=Path(os.environ.get("LOCALE_BUNDLE_DIR") or DEFAULT_BUNDLE_DIR))
+    parser.add_argument("--concurrency", type=int, default=4, help="DeepL requests in flight per locale")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("DEEPL_API_KEY") or os.environ.get("TESTSPRITE_API_KEY")
+    if not api_key:
+        print("DEEPL_API_KEY is not set", file=sys.stderr)
+        return 1
+    langs = [lang.strip().lower() for lang in args.lang.split(",")] if args.lang else frontend_locales()
+
+    client = DeepLClient(api_key, base_url=os.environ.get("DEEPL_BASE_URL", DEFAULT_DEEPL_BASE_URL),
+                         max_connections=args.concurrency)
+    try:
+        results = [await build_bundle(lang, client, args.output, args.concurrency) for lang in langs if lang]
+    finally:
+        await client.close()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,75 @@
+"""
+Precomputed melanotan protocol table for Peptide Professor API
+
+Run as a script to export the table as static JSON for the frontend:
+
+    python melanotan_table.py [output.json]
+"""
+import itertools
+import json
+import sys
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+from calculators import (
+    MELANOTAN_BASE_DOSES, FITZPATRICK_MULTIPLIERS, UV_ADJUSTMENTS, SENSITIVITY_ADJUSTMENTS, TARGET_TIMELINES,
+    melanotan_protocol
+)
+from response_cache import serialize_json
+
+# Every input the melanotan calculator defines, in MelanotanCalculatorInput field order
+MELANOTAN_INPUT_SPACE = (
+    ("peptide", tuple(MELANOTAN_BASE_DOSES)),
+    ("fitzpatrick_scale", tuple(FITZPATRICK_MULTIPLIERS)),
+    ("uv_exposure", tuple(UV_ADJUSTMENTS)),
+    ("sensitivity", tuple(SENSITIVITY_ADJUSTMENTS)),
+    ("target_tan", tuple(TARGET_TIMELINES)),
+)
+
+DEFAULT_EXPORT_PATH = Path(__file__).resolve().parent.parent / "frontend" / "src" / "data" / "static" / "melanotan-protocols.json"
+
+
+class MelanotanTable:
+    """Every valid melanotan protocol, computed once and kept as response bytes
+
+    Each entry is the serialized response up to the opening quote of its
+    ``calculation_id`` (always the last field), so a request costs a dictionary
+    lookup plus appending a fresh id.
+    """
+
+    def __init__(self):
+        protocols = {}
+        body_prefixes = {}
+        for key in itertools.product(*(values for _, values in MELANOTAN_INPUT_SPACE)):
+            protocol = melanotan_protocol(*key)
+            protocols[key] = protocol
+            body_prefixes[key] = serialize_json({**protocol, "calculation_id": ""})[:-len(b'"}')]
+        self.protocols = MappingProxyType(protocols)
+        self.body_prefixes = MappingProxyType(body_prefixes)
+
+    def __len__(self) -> int:
+        return len(self.body_prefixes)
+
+    def response_body(self, key: Tuple, calculation_id: str) -> Optional[bytes]:
+        """Serialized MelanotanResult for ``key``, or None if the inputs are outside the table"""
+        prefix = self.body_prefixes.get(key)
+        if prefix is None:
+            return None
+        return prefix + calculation_id.encode("ascii") + b'"}'
+
+    def export(self) -> Dict[str, Any]:
+        """The whole table as JSON-ready data, keyed by the inputs joined with ``|``"""
+        return {
+            "inputs": {name: list(values) for name, values in MELANOTAN_INPUT_SPACE},
+            "key_order": [name for name, _ in MELANOTAN_INPUT_SPACE],
+            "protocols": {"|".join(str(part) for part in key): protocol for key, protocol in self.protocols.items()}
+        }
+
+
+if __name__ == "__main__":
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EXPORT_PATH
+    table = MelanotanTable()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(table.export(), ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Wrote {len(table)} melanotan protocols to {output}")
@@ -1,35 +1,12 @@
 """
 Rate limiting and CORS middleware for Peptide Professor API
 """
-import time
 import os
-from collections import defaultdict
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from typing import Dict
+from rate_limit import create_rate_limiter
 
-# Simple in-memory rate limiter
-class RateLimiter:
-    def __init__(self):
-        self.requests: Dict[str, list] = defaultdict(list)
-        self.window_size = 60  # 60 seconds
-        self.max_requests = 60  # 60 requests per minute
-    
-    def is_allowed(self, identifier: str) -> bool:
-        now = time.time()
-        # Clean old requests
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier] 
-            if now - req_time < self.window_size
-        ]
-        
-        # Check if under limit
-        if len(self.requests[identifier]) < self.max_requests:
-            self.requests[identifier].append(now)
-            return True
-        return False
-
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limiter()
 
 async def rate_limit_middleware(request: Request, call_next):
     """Rate limiting middleware"""
@@ -43,7 +20,7 @@ async def rate_limit_middleware(request: Request, call_next):
         
         # Apply rate limiting to POST endpoints
         if request.method == "POST":
-            if not rate_limiter.is_allowed(client_ip):
+            if not await rate_limiter.check(client_ip):
                 return JSONResponse(
                     status_code=429,
                     content={"detail": "Too Many Requests"}
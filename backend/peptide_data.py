@@ -1443,5 +1443,9 @@ def get_default_blog_data():
         }
     ]
 
+def get_blog_metadata():
+    """Blog posts as /api/blog lists them, without their markdown bodies"""
+    return [{key: value for key, value in post.items() if key != 'content'} for post in get_default_blog_data()]
+
 # Export the function and data
 __all__ = ['peptide_categories', 'get_peptide_categories']
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Lazily created, app-lifetime httpx connection pool shared by the API clients of Peptide Professor API
+"""
+from typing import Dict, Optional
+
+import httpx
+
+
+class PooledAPIClient:
+    """Base for REST API clients that reuse one keep-alive ``httpx.AsyncClient``
+
+    The pool is created on first use and lives until ``close()``, so calls reuse
+    warm TCP and TLS connections. Subclasses supply ``auth_headers()``;
+    ``base_url`` can point at a local fake server in tests and benchmarks.
+    """
+
+    def __init__(self, api_key: Optional[str], base_url: str, timeout: float = 10.0, max_connections: int = 20):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def auth_headers(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.auth_headers(),
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self.client
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
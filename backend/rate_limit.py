@@ -0,0 +1,317 @@
+"""
+Rate limiting algorithms and shared-state backends for Peptide Professor API
+
+Every backend implements ``async check(identifier) -> bool`` using the same
+sliding-window-counter estimate. Pick one with RATE_LIMIT_BACKEND:
+
+- ``memory`` (default): per-process state, exact for a single worker
+- ``sqlite``: a WAL-mode SQLite file shared by all workers on one host
+- ``redis``: any server speaking the Redis protocol, shared across hosts
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def sliding_window_estimate(now: float, window_size: int, previous: int, current: int) -> float:
+    """Requests in the last ``window_size`` seconds, weighting the previous window by its overlap"""
+    window_start = (now // window_size) * window_size
+    overlap = 1.0 - (now - window_start) / window_size
+    return previous * overlap + current
+
+
+class RateLimiter:
+    """Sliding-window-counter rate limiter with O(1) checks and a bounded key table
+
+    Each identifier keeps only its request counts for the current and the previous
+    fixed window. The previous count is weighted by how much of that window still
+    overlaps the sliding window, which approximates a true sliding log without
+    storing timestamps.
+
+    Identifiers idle for two full windows carry no useful state and are evicted as
+    they age out, and the table never holds more than ``max_keys`` identifiers
+    (least recently seen evicted first), so memory stays flat however many distinct
+    clients we see.
+    """
+
+    def __init__(self, window_size: int = 60, max_requests: int = 60, max_keys: int = 100_000):
+        self.window_size = window_size  # seconds
+        self.max_requests = max_requests  # per window
+        self.max_keys = max_keys
+        # identifier -> [window index, previous window count, current window count],
+        # ordered from least to most recently seen
+        self.requests: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    def is_allowed(self, identifier: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        window = int(now // self.window_size)
+        self._evict_idle(window)
+
+        state = self.requests.get(identifier)
+        if state is None:
+            state = [window, 0, 0]
+            self.requests[identifier] = state
+            if len(self.requests) > self.max_keys:
+                self.requests.popitem(last=False)
+        else:
+            self.requests.move_to_end(identifier)
+            if state[0] != window:
+                state[1] = state[2] if state[0] == window - 1 else 0
+                state[2] = 0
+                state[0] = window
+
+        if sliding_window_estimate(now, self.window_size, state[1], state[2]) < self.max_requests:
+            state[2] += 1
+            return True
+        return False
+
+    async def check(self, identifier: str) -> bool:
+        return self.is_allowed(identifier)
+
+    def _evict_idle(self, window: int) -> None:
+        # Entries are in last-seen order, so idle identifiers collect at the front
+        requests = self.requests
+        while requests:
+            identifier = next(iter(requests))
+            if requests[identifier][0] >= window - 1:
+                break
+            del requests[identifier]
+
+
+class SQLiteRateLimiter:
+    """Sliding-window counter kept in a SQLite file, shared by every worker on the host
+
+    By default checks are decided in memory against a local copy of the shared
+    counts, so a check costs about what RateLimiter's does (single-digit
+    microseconds) and never leaves the event loop. Every ``sync_interval``
+    seconds one background transaction adds this process's admitted requests to
+    the file and reads back the combined counts for every identifier checked
+    since the last sync. The price is staleness: between syncs a worker only sees
+    its own new requests, so a client spreading requests over N workers can get
+    up to about N sync intervals' worth of them past the limit before every
+    worker catches up.
+
+    ``sync_interval=0`` makes every check its own IMMEDIATE transaction (a
+    two-row read plus an upsert) instead: exact across workers, but each check
+    waits for a thread hop and the file lock, roughly 90 us at the median and a
+    few hundred at p99 (see benchmarks/bench_shared_rate_limiters.py).
+
+    Transactions run on a dedicated single-thread executor, never the loop's
+    default one, in WAL mode with synchronous=NORMAL. Rows older than the previous
+    window are purged once per window. If another worker holds the write lock for
+    longer than ``busy_timeout`` seconds or SQLite fails otherwise, decisions keep
+    coming from the local counts (which then act as an in-process RateLimiter)
+    and unsynced requests are retried at the next sync.
+    """
+
+    # Identifiers per SELECT, well under SQLite's bound-parameter limit
+    SYNC_QUERY_BATCH = 500
+
+    def __init__(self, path: str, window_size: int = 60, max_requests: int = 60, busy_timeout: float = 0.05,
+                 sync_interval: float = 0.1):
+        self.window_size = window_size
+        self.max_requests = max_requests
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit-sqlite")
+        # Local view of the shared counts, plus this process's requests since the last sync
+        self.local = RateLimiter(window_size=window_size, max_requests=max_requests)
+        self.pending: Dict[Tuple[str, int], int] = {}
+        self.seen: Set[str] = set()
+        self.syncing: Optional[asyncio.Future] = None
+        self.synced_at = 0.0
+        self.connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "identifier TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (identifier, window)) WITHOUT ROWID"
+        )
+        self.purged_window = None
+
+    def _transaction(self, window: int, body: Callable[[sqlite3.Connection], Any]) -> Any:
+        connection = self.connection
+        # One connection per process; the lock covers callers outside the executor
+        with self.lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if self.purged_window != window:
+                    connection.execute("DELETE FROM rate_limits WHERE window < ?", (window - 1,))
+                    self.purged_window = window
+                result = body(connection)
+                connection.execute("COMMIT")
+            except Exception:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+        return result
+
+    def is_allowed(self, identifier: str, now: Optional[float] = None) -> bool:
+        """Decide one request in its own transaction, exactly across workers"""
+        now = time.time() if now is None else now
+        window = int(now // self.window_size)
+
+        def check(connection: sqlite3.Connection) -> bool:
+            counts = dict(connection.execute(
+                "SELECT window, count FROM rate_limits WHERE identifier = ? AND window IN (?, ?)",
+                (identifier, window - 1, window)
+            ).fetchall())
+            allowed = sliding_window_estimate(
+                now, self.window_size, counts.get(window - 1, 0), counts.get(window, 0)
+            ) < self.max_requests
+            if allowed:
+                connection.execute(
+                    "INSERT INTO rate_limits (identifier, window, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT (identifier, window) DO UPDATE SET count = count + 1",
+                    (identifier, window)
+                )
+            return allowed
+
+        return self._transaction(window, check)
+
+    def sync(self, window: int, increments: Dict[Tuple[str, int], int],
+             identifiers: List[str]) -> Dict[str, List[int]]:
+        """Add ``increments`` to the file and return [previous, current] counts for ``identifiers``"""
+        def exchange(connection: sqlite3.Connection) -> Dict[str, List[int]]:
+            connection.executemany(
+                "INSERT INTO rate_limits (identifier, window, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (identifier, window) DO UPDATE SET count = count + excluded.count",
+                [(identifier, request_window, count) for (identifier, request_window), count in increments.items()
+                 if request_window >= window - 1]
+            )
+            counts = {identifier: [0, 0] for identifier in identifiers}
+            for start in range(0, len(identifiers), self.SYNC_QUERY_BATCH):
+                batch = identifiers[start:start + self.SYNC_QUERY_BATCH]
+                rows = connection.execute(
+                    "SELECT identifier, window, count FROM rate_limits WHERE window IN (?, ?) "
+                    f"AND identifier IN ({', '.join('?' * len(batch))})",
+                    (window - 1, window, *batch)
+                )
+                for identifier, row_window, count in rows:
+                    counts[identifier][row_window - window + 1] = count
+            return counts
+
+        return self._transaction(window, exchange)
+
+    async def _sync(self) -> None:
+        window = int(time.time() // self.window_size)
+        increments, self.pending = self.pending, {}
+        identifiers, self.seen = list(self.seen), set()
+        try:
+            counts = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.sync, window, increments, identifiers
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite rate limit backend unavailable, using in-process counts: {str(e)}")
+            # Keep this window's requests for the next sync; older ones no longer matter
+            for key, count in increments.items():
+                if key[1] >= window - 1:
+                    self.pending[key] = self.pending.get(key, 0) + count
+            return
+        finally:
+            self.synced_at = time.time()
+            self.syncing = None
+
+        for identifier, (previous, current) in counts.items():
+            state = self.local.requests.get(identifier)
+            if state is not None and state[0] == window:
+                state[1] = previous
+                # Requests admitted while the sync ran aren't in the file yet
+                state[2] = current + self.pending.get((identifier, window), 0)
+
+    async def check(self, identifier: str) -> bool:
+        now = time.time()
+        if not self.sync_interval:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, self.is_allowed, identifier, now)
+            except sqlite3.Error as e:
+                logger.warning(f"SQLite rate limit backend unavailable, using in-process limiter: {str(e)}")
+                return self.local.is_allowed(identifier, now)
+
+        allowed = self.local.is_allowed(identifier, now)
+        self.seen.add(identifier)
+        if allowed:
+            key = (identifier, int(now // self.window_size))
+            self.pending[key] = self.pending.get(key, 0) + 1
+        if self.syncing is None and now - self.synced_at >= self.sync_interval:
+            self.syncing = asyncio.ensure_future(self._sync())
+        return allowed
+
+
+class RedisRateLimiter:
+    """Sliding-window counter stored in a Redis-protocol server
+
+    A check is a single pipelined round trip (GET previous window, INCR and EXPIRE
+    the current one). Denied requests are rolled back with a DECR so they don't
+    extend a client's block. If the server is unreachable the check falls back to
+    an in-process RateLimiter rather than failing requests.
+
+    ``client`` may be any ``redis.asyncio``-compatible client, which is how
+    benchmarks/bench_shared_rate_limiters.py points this at a local stand-in. That
+    stand-in only mimics GET/INCR/EXPIRE/DECR; the pipeline and DECR-on-deny
+    behaviour against a real server is checked by the same benchmark's
+    ``--redis-url`` mode.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", window_size: int = 60, max_requests: int = 60,
+                 key_prefix: str = "ratelimit", client=None):
+        if client is None:
+            import redis.asyncio as redis  # optional dependency, only needed for this backend
+            client = redis.from_url(url)
+        self.client = client
+        self.window_size = window_size
+        self.max_requests = max_requests
+        self.key_prefix = key_prefix
+        self.fallback = RateLimiter(window_size=window_size, max_requests=max_requests)
+
+    async def check(self, identifier: str) -> bool:
+        now = time.time()
+        window = int(now // self.window_size)
+        current_key = f"{self.key_prefix}:{identifier}:{window}"
+        previous_key = f"{self.key_prefix}:{identifier}:{window - 1}"
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(previous_key)
+                pipe.incr(current_key)
+                pipe.expire(current_key, self.window_size * 2)
+                previous, current, _ = await pipe.execute()
+
+            # INCR already counted this request; judge it against the count before it
+            if sliding_window_estimate(now, self.window_size, int(previous or 0), current - 1) < self.max_requests:
+                return True
+            await self.client.decr(current_key)
+            return False
+        except Exception as e:
+            logger.warning(f"Redis rate limit backend unavailable, using in-process limiter: {str(e)}")
+            return self.fallback.is_allowed(identifier, now)
+
+
+def create_rate_limiter():
+    """Build the rate limiter selected by the RATE_LIMIT_* environment variables"""
+    backend = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+    window_size = int(os.environ.get("RATE_LIMIT_WINDOW_SECONDS", 60))
+    max_requests = int(os.environ.get("RATE_LIMIT_MAX_REQUESTS", 60))
+
+    if backend == "sqlite":
+        path = os.environ.get("RATE_LIMIT_SQLITE_PATH", "/tmp/peptide-professor-rate-limit.sqlite3")
+        busy_timeout = float(os.environ.get("RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS", 50)) / 1000
+        # 0 makes every check a transaction: exact across workers, but slower
+        sync_interval = float(os.environ.get("RATE_LIMIT_SQLITE_SYNC_MS", 100)) / 1000
+        return SQLiteRateLimiter(path, window_size=window_size, max_requests=max_requests, busy_timeout=busy_timeout,
+                                 sync_interval=sync_interval)
+    if backend == "redis":
+        url = os.environ.get("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+        return RedisRateLimiter(url, window_size=window_size, max_requests=max_requests)
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND {backend!r}, using in-memory rate limiting")
+    return RateLimiter(window_size=window_size, max_requests=max_requests)
@@ -0,0 +1,57 @@
+"""
+Async Resend client with a persistent connection pool for Peptide Professor API
+"""
+from typing import Any, Dict, Optional
+
+import httpx
+
+from pooled_client import PooledAPIClient
+
+DEFAULT_RESEND_BASE_URL = "https://api.resend.com"
+
+
+class ResendError(Exception):
+    """Resend rejected an email or answered with an error status"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Resend API error {status_code}: {message}")
+        self.status_code = status_code
+
+
+class ResendNotConfiguredError(ResendError):
+    """No API key, so there is nothing to send with; retrying cannot help"""
+
+    def __init__(self):
+        Exception.__init__(self, "Resend API key not configured (set RESEND_API_KEY)")
+        self.status_code = None
+
+
+class ResendClient(PooledAPIClient):
+    """Sends emails through the Resend REST API over a keep-alive ``httpx.AsyncClient``
+
+    The pool (see PooledAPIClient) is reused for the life of the app, so sends
+    skip the TCP and TLS handshakes the blocking SDK pays on every call.
+    """
+
+    def __init__(self, api_key: Optional[str], base_url: str = DEFAULT_RESEND_BASE_URL, timeout: float = 10.0,
+                 max_connections: int = 20):
+        super().__init__(api_key, base_url, timeout=timeout, max_connections=max_connections)
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    async def send(self, params: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send one email (same params as ``resend.Emails.send``); ``timeout`` overrides the default
+
+        Raises ResendNotConfiguredError without touching the network when there is no API key.
+        """
+        if not self.configured:
+            raise ResendNotConfiguredError()
+        response = await self._get_client().post(
+            "/emails",
+            json=params,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        if response.status_code >= 400:
+            raise ResendError(response.status_code, response.text)
+        return response.json()
@@ -0,0 +1,109 @@
+"""
+Pre-serialized response cache for Peptide Professor API
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+CACHE_CONTROL = "public, max-age=300"
+
+# Bodies smaller than this are sent uncompressed; the framing overhead outweighs the savings
+MIN_COMPRESS_SIZE = 512
+
+# (brotli quality, gzip level). Maximum compression costs ~170 ms for the full
+# catalog, so it is reserved for the fixed set of responses built at startup;
+# variants built on demand (projections, filters, grids) compress in a few ms.
+MAX_COMPRESSION = (11, 9)
+FAST_COMPRESSION = (5, 6)
+
+
+def serialize_json(content: Any) -> bytes:
+    """JSON bytes in the same encoding FastAPI's JSONResponse uses, so clients see identical bytes"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag, as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class CachedResponse:
+    """A JSON payload serialized once, with compressed variants and a strong ETag per encoding
+
+    Pass ``max_compression=True`` only for responses built once ahead of time.
+    """
+
+    def __init__(self, content: Any, max_compression: bool = False):
+        self.body = serialize_json(content)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.encoded: Dict[str, bytes] = {}
+
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            brotli_quality, gzip_level = MAX_COMPRESSION if max_compression else FAST_COMPRESSION
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(self.body, quality=brotli_quality)
+            self.encoded["gzip"] = gzip.compress(self.body, compresslevel=gzip_level, mtime=0)
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        # Preference order: brotli, then gzip
+        for coding in ("br", "gzip"):
+            if coding in self.encoded and accepted.get(coding, wildcard) > 0:
+                return coding
+        return None
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong validators must differ per content-coding (RFC 9110 8.8.3), so suffix the encoded variants"""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def respond(self, request: Request) -> Response:
+        encoding = self.choose_encoding(request.headers.get("accept-encoding", ""))
+        etag = self.etag_for(encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self.body
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            body = self.encoded[encoding]
+        return Response(content=body, media_type="application/json", headers=headers)
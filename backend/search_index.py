@@ -0,0 +1,146 @@
+"""
+Full-text search over the peptide catalog for Peptide Professor API
+"""
+import heapq
+import html
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from catalog import CatalogIndex, get_catalog_index
+
+# Peptide fields indexed for search, in the order snippets are taken from
+SEARCH_FIELDS = ('description', 'benefits', 'mechanism', 'researchFindings', 'sideEffects', 'chemicalMakeup')
+
+# BM25 parameters (the usual Robertson/Sparck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_RADIUS = 80
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to with".split()
+)
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+# (field position in field_texts, start offset, end offset) of one token occurrence
+Hit = Tuple[int, int, int]
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in (match.lower() for match in TOKEN_PATTERN.findall(text)) if token not in STOPWORDS]
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, list):
+        return ". ".join(str(item) for item in value)
+    return str(value) if value else ""
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking, built once per catalog version"""
+
+    def __init__(self, catalog_index: CatalogIndex):
+        self.version = catalog_index.version
+        self.slugs = catalog_index.peptide_ids
+        self.names = [catalog_index.peptides_by_slug[slug].get('name', slug) for slug in self.slugs]
+        self.categories = [catalog_index.get_category_key(slug) for slug in self.slugs]
+        self.field_texts: List[List[Tuple[str, str]]] = []
+        # Token offsets per document, so snippets never have to re-scan the text
+        self.hits: List[Dict[str, List[Hit]]] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        doc_lengths = []
+
+        for doc_id, slug in enumerate(self.slugs):
+            peptide = catalog_index.peptides_by_slug[slug]
+            texts = [(field, _field_text(peptide.get(field))) for field in SEARCH_FIELDS]
+            texts = [(field, text) for field, text in texts if text]
+            doc_hits: Dict[str, List[Hit]] = defaultdict(list)
+            for field_position, (_, text) in enumerate(texts):
+                for match in TOKEN_PATTERN.finditer(text):
+                    term = match.group(0).lower()
+                    if term not in STOPWORDS:
+                        doc_hits[term].append((field_position, match.start(), match.end()))
+            self.field_texts.append(texts)
+            self.hits.append(dict(doc_hits))
+            doc_lengths.append(sum(len(term_hits) for term_hits in doc_hits.values()))
+            for term, term_hits in doc_hits.items():
+                self.postings[term].append((doc_id, len(term_hits)))
+
+        self.postings = dict(self.postings)
+        doc_count = len(self.slugs)
+        average_length = (sum(doc_lengths) / doc_count) if doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # Per-document BM25 length normalisation, folded into one constant per doc
+        self.length_norm = [
+            BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) if average_length else BM25_K1
+            for length in doc_lengths
+        ]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.postings]
+        if not terms:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            idf = self.idf[term]
+            for doc_id, tf in self.postings[term]:
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + self.length_norm[doc_id])
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            {
+                "slug": self.slugs[doc_id],
+                "name": self.names[doc_id],
+                "category": self.categories[doc_id],
+                "score": round(score, 4),
+                **self.snippet(doc_id, terms)
+            }
+            for doc_id, score in top
+        ]
+
+    def snippet(self, doc_id: int, terms: List[str]) -> Dict[str, str]:
+        """HTML-escaped excerpt around the first query match, with matches wrapped in <mark>"""
+        doc_hits = [self.hits[doc_id][term] for term in terms if term in self.hits[doc_id]]
+        if not doc_hits:
+            return {"field": "", "snippet": ""}
+
+        field_position, match_start, match_end = min(term_hits[0] for term_hits in doc_hits)
+        field, text = self.field_texts[doc_id][field_position]
+        start = max(0, match_start - SNIPPET_RADIUS)
+        end = min(len(text), match_end + SNIPPET_RADIUS)
+        window = sorted(
+            (hit_start, hit_end)
+            for term_hits in doc_hits
+            for hit_field, hit_start, hit_end in term_hits
+            if hit_field == field_position and hit_start >= start and hit_end <= end
+        )
+
+        excerpt, position = [], start
+        for hit_start, hit_end in window:
+            excerpt.append(html.escape(text[position:hit_start]))
+            excerpt.append(f"<mark>{html.escape(text[hit_start:hit_end])}</mark>")
+            position = hit_end
+        excerpt.append(html.escape(text[position:end]))
+        return {
+            "field": field,
+            "snippet": ("…" if start > 0 else "") + "".join(excerpt) + ("…" if end < len(text) else "")
+        }
+
+
+_search_index = SearchIndex(get_catalog_index())
+
+
+def get_search_index() -> SearchIndex:
+    """Return the search index for the current catalog, rebuilding it when the catalog changes"""
+    global _search_index
+    catalog_index = get_catalog_index()
+    if _search_index.version != catalog_index.version:
+        _search_index = SearchIndex(catalog_index)
+    return _search_index
@@ -1,14 +1,35 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
 import os
+import asyncio
+import math
 from datetime import datetime, timedelta
 import secrets
-import resend
-import httpx
-from peptide_data import get_peptide_categories, get_default_team_data, get_default_blog_data
+import tempfile
+from peptide_data import get_default_team_data, get_default_blog_data, get_blog_metadata
+from catalog import get_catalog_index
+from response_cache import CachedResponse
+from search_index import get_search_index
+from blog_cache import blog_content_cache
+from email_queue import EmailQueue
+from resend_client import ResendClient, DEFAULT_RESEND_BASE_URL
+from subscriber_store import create_subscriber_store
+from calculation_store import create_calculation_store
+from cohort import open_cohort_csv, stream_bmi_cohort
+from melanotan_table import MelanotanTable
+from deepl_client import DeepLClient, DeepLError, DEFAULT_DEEPL_BASE_URL
+from translation_cache import create_translation_cache
+from translation_batcher import TranslationBatcher
+from locale_bundles import create_locale_bundles
+from translation_segments import translate_segmented
+from calculators import (
+    reconstitute, reconstitute_many, reconstitution_grid, DEFAULT_GRID_SPECS, MAX_GRID_AXIS, GRID_AXIS_LIMITS,
+    bmi_metrics, activity_key, melanotan_protocol, ResultCache
+)
 import logging
 from middleware import rate_limit_middleware, cors_middleware
 from passlib.context import CryptContext
@@ -24,8 +45,37 @@ app = FastAPI(title="Professor Peptides API", version="2.0.0")
 app.middleware("http")(rate_limit_middleware)
 app.middleware("http")(cors_middleware)
 
-# Initialize Resend
-resend.api_key = os.environ.get("RESEND_API_KEY")
+# Initialize Resend (pooled async client; RESEND_BASE_URL lets tests point it at a fake server)
+resend_client = ResendClient(
+    os.environ.get("RESEND_API_KEY"),
+    base_url=os.environ.get("RESEND_BASE_URL", DEFAULT_RESEND_BASE_URL),
+    timeout=float(os.environ.get("RESEND_TIMEOUT_SECONDS", 10))
+)
+
+# Emails are sent by background workers so handlers never wait on Resend
+email_queue = EmailQueue(resend_client.send, workers=int(os.environ.get("EMAIL_QUEUE_WORKERS", 2)))
+
+# DeepL over one pooled, app-lifetime client (prefers DEEPL_API_KEY if both keys are set)
+deepl_client = DeepLClient(
+    os.environ.get("DEEPL_API_KEY") or os.environ.get("TESTSPRITE_API_KEY"),
+    base_url=os.environ.get("DEEPL_BASE_URL", DEFAULT_DEEPL_BASE_URL),
+    timeout=float(os.environ.get("DEEPL_TIMEOUT_SECONDS", 10))
+)
+
+# Translations keyed by hash(text, target_lang); TRANSLATION_CACHE_PATH adds a persistent tier
+translation_cache = create_translation_cache()
+
+async def translate_and_cache(texts: List[str], target_lang: str) -> List[Dict[str, Any]]:
+    """One DeepL request for ``texts``, caching the translations in one write as they come back"""
+    translations = await deepl_client.translate(texts, target_lang)
+    await translation_cache.put_many(texts, target_lang, translations)
+    return translations
+
+# Concurrent cache misses share in-flight requests and go to DeepL in small batches
+translation_batcher = TranslationBatcher(
+    translate_and_cache,
+    window=float(os.environ.get("TRANSLATION_BATCH_WINDOW_MS", 5)) / 1000
+)
 
 # Pydantic models
 class ContactForm(BaseModel):
@@ -69,6 +119,7 @@ class CalculatorResult(BaseModel):
     units_per_ml: Optional[float] = None
     concentration_mcg: Optional[float] = None
     doses_per_vial: int
+    calculation_id: Optional[str] = None
 
 class TranslateRequest(BaseModel):
     text: str
@@ -99,9 +150,98 @@ class MelanotanResult(BaseModel):
     safety_warnings: List[str] = []
     calculation_id: str
 
-# In-memory storage (replace with database in production)
-subscribers = {}
-calculation_history = {}
+# Newsletter subscribers persist in SQLite (see subscriber_store.py)
+subscribers = create_subscriber_store()
+
+# Recent dosage calculations, retrievable by id for share links (see calculation_store.py)
+calculations = create_calculation_store()
+
+# Calculators are pure, so results are shared across requests with the same inputs
+calculator_cache = ResultCache(max_entries=int(os.environ.get("CALCULATOR_CACHE_ENTRIES", 4096)))
+
+# Pre-translated catalogs built offline by locale_bundles.py, served for ?lang=xx
+locale_bundles = create_locale_bundles()
+
+# Every valid melanotan protocol, pre-serialized once at startup (see melanotan_table.py)
+melanotan_table = MelanotanTable()
+melanotan_table_response = None
+
+# How often expired, never-confirmed newsletter signups are purged
+SUBSCRIBER_PURGE_INTERVAL_SECONDS = 300
+subscriber_purge_task = None
+
+async def purge_expired_subscribers():
+    while True:
+        await asyncio.sleep(SUBSCRIBER_PURGE_INTERVAL_SECONDS)
+        try:
+            removed = await subscribers.purge_expired(datetime.utcnow())
+            if removed:
+                logger.info(f"Purged {removed} expired pending newsletter signups")
+        except Exception as e:
+            logger.error(f"Subscriber purge error: {str(e)}")
+
+@app.on_event("startup")
+async def preload_blog_content():
+    """Warm the blog content cache so the first blog requests don't hit disk"""
+    await blog_content_cache.preload()
+
+@app.on_event("startup")
+async def load_locale_bundles():
+    await asyncio.to_thread(locale_bundles.preload, get_catalog_index().version)
+
+def prebuild_responses():
+    """Build the fixed, most requested responses once with maximum compression
+
+    Variants built later on demand use fast compression, so a miss never costs
+    the ~170 ms a maximum-quality brotli pass over the catalog takes.
+    """
+    global blog_summary_response, melanotan_table_response
+    index = get_catalog_index()
+    index.cached(("response", "statistics"), lambda: CachedResponse(index.statistics, max_compression=True))
+    for key, category in index.categories.items():
+        index.cached(("response", "category", key, None), lambda: CachedResponse(category, max_compression=True))
+    for catalog in [index, *(locale_bundles.get(lang).index for lang in locale_bundles.languages)]:
+        catalog.cached(("response", "categories", None),
+                       lambda: CachedResponse(catalog.categories, max_compression=True))
+    blog_summary_response = CachedResponse(get_blog_metadata(), max_compression=True)
+    melanotan_table_response = CachedResponse(melanotan_table.export(), max_compression=True)
+
+@app.on_event("startup")
+async def build_static_responses():
+    await asyncio.to_thread(prebuild_responses)
+
+@app.on_event("startup")
+async def start_email_queue():
+    if not resend_client.configured:
+        logger.warning("RESEND_API_KEY is not set; emails will be dead-lettered without being sent")
+    await email_queue.start()
+
+@app.on_event("startup")
+async def start_subscriber_purge():
+    global subscriber_purge_task
+    subscriber_purge_task = asyncio.create_task(purge_expired_subscribers())
+
+@app.on_event("shutdown")
+async def stop_subscriber_purge():
+    if subscriber_purge_task is not None:
+        subscriber_purge_task.cancel()
+    await subscribers.close()
+
+@app.on_event("shutdown")
+async def close_calculation_store():
+    calculations.close()
+
+@app.on_event("shutdown")
+async def close_translation_client():
+    await translation_batcher.close()
+    await deepl_client.close()
+    translation_cache.close()
+
+@app.on_event("shutdown")
+async def stop_email_queue():
+    """Let queued emails finish sending before the worker exits"""
+    await email_queue.stop()
+    await resend_client.close()
 
 @app.get("/")
 async def root():
@@ -117,152 +257,264 @@ async def health_check():
         "version": "2.0.0"
     }
 
+@app.get("/api/metrics/email-queue")
+async def get_email_queue_metrics():
+    """Email delivery queue depth, outcomes and delivery latency"""
+    return email_queue.metrics()
+
+@app.get("/api/metrics/translation-cache")
+async def get_translation_cache_metrics():
+    """Translation cache size and hit/miss counters per tier"""
+    return translation_cache.metrics()
+
+@app.get("/api/metrics/translation-batcher")
+async def get_translation_batcher_metrics():
+    """How many translation requests were coalesced and how they were batched"""
+    return translation_batcher.metrics()
+
+@app.get("/api/metrics/calculator-cache")
+async def get_calculator_cache_metrics():
+    """Calculator result cache size and hit/miss counters"""
+    return calculator_cache.metrics()
+
 @app.get("/api/statistics")
-async def get_statistics():
+async def get_statistics(request: Request):
     """Get dynamic statistics about peptides, studies, and platform metrics"""
     try:
-        categories = get_peptide_categories()
-        
-        # Count total peptides across all categories
-        total_peptides = 0
-        total_citations = 0
-        fda_approved_count = 0
-        categories_count = len(categories)
-        
-        for category_key, category in categories.items():
-            if 'peptides' in category:
-                peptides_in_category = category['peptides']
-                total_peptides += len(peptides_in_category)
-                
-                # Count citations for each peptide
-                for peptide in peptides_in_category:
-                    citations = peptide.get('citations', [])
-                    total_citations += len(citations)
-                    
-                    # Count FDA approved peptides
-                    if peptide.get('fdaApproved', False):
-                        fda_approved_count += 1
-        
-        # Count research studies from static data
-        # We'll count various types of studies and research items
-        research_studies_count = 0
-        
-        # Static research data counts (these can be updated as more data is added)
-        clinical_trials = 15  # Based on research data structure
-        safety_studies = 12   # Safety profile studies
-        publication_studies = 25  # Publication citations
-        drug_interaction_studies = 8  # Drug interaction data
-        
-        research_studies_count = clinical_trials + safety_studies + publication_studies + drug_interaction_studies
-        
-        # Count professional tools/calculators available
-        professional_tools = 7  # BMI, GLP-1 dosing, reconstitution, etc.
-        
-        # Count team members (medical advisors)
-        medical_advisors = 1  # Dr. Sheraz Ahmad
-        
-        return {
-            "peptides": {
-                "total": total_peptides,
-                "description": "Comprehensive peptide profiles with mechanisms, structures, safety notes, and references"
-            },
-            "citations": {
-                "total": total_citations,
-                "description": "Curated peer-reviewed studies and clinical data"
-            },
-            "tools": {
-                "total": professional_tools,
-                "description": "GLP-1 dosage, reconstitution, BMI and metabolic, interaction checks, and more"
-            },
-            "medical_oversight": {
-                "total": medical_advisors,
-                "description": "Board-certified physician guidance for scientific accuracy"
-            },
-            "research_studies": {
-                "total": research_studies_count,
-                "description": "Clinical trials, safety studies, and research publications"
-            },
-            "categories": {
-                "total": categories_count,
-                "description": "Specialized peptide categories"
-            },
-            "fda_approved": {
-                "total": fda_approved_count,
-                "description": "FDA-approved peptide therapeutics"
-            },
-            "last_updated": datetime.utcnow().isoformat()
-        }
-        
+        index = get_catalog_index()
+        cached = index.cached(("response", "statistics"), lambda: CachedResponse(index.statistics))
+        return cached.respond(request)
     except Exception as e:
         logger.error(f"Error fetching statistics: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching statistics")
 
+def parse_catalog_fields(index, fields: Optional[str]) -> Optional[tuple]:
+    """Validate a ``fields`` projection against the catalog, mapping bad input to a 400"""
+    try:
+        return index.normalize_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def locale_bundle_for(lang: str):
+    """Pre-translated bundle for ``lang``, or a 404 listing the languages that have one"""
+    bundle = locale_bundles.get(lang)
+    if bundle is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No translated catalog for '{lang}'; available: {', '.join(['en', *locale_bundles.languages])}"
+        )
+    return bundle
+
+def catalog_index_for(lang: Optional[str]):
+    """The English catalog index, or the pre-translated one for ``lang``"""
+    if not lang or lang.lower() == "en":
+        return get_catalog_index()
+    return locale_bundle_for(lang).index
+
+def all_categories_response(request: Request, fields: Optional[str], index=None):
+    """Cached, pre-serialized response for the full (optionally projected) catalog"""
+    index = index or get_catalog_index()
+    projection = parse_catalog_fields(index, fields)
+    cached = index.cached(
+        ("response", "categories", projection),
+        lambda: CachedResponse(index.project_categories(projection))
+    )
+    return cached.respond(request)
+
+def filtered_peptides_response(request: Request, filters: Dict[str, Optional[str]], cursor: Optional[str],
+                               limit: int, fields: Optional[str], index=None):
+    """Cached response for one page of peptides matching ``filters``, resolved through bitset indexes"""
+    index = index or get_catalog_index()
+    projection = parse_catalog_fields(index, fields)
+    try:
+        matched = index.filter_peptide_ids(filters)
+        after = index.decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def build():
+        ids, next_after = index.page_peptide_ids(matched, after, limit)
+        return CachedResponse({
+            "peptides": [
+                index.project_peptide(index.peptides_by_slug[index.peptide_ids[peptide_id]], projection)
+                for peptide_id in ids
+            ],
+            "total": bin(matched).count("1"),
+            "next_cursor": index.encode_cursor(next_after) if next_after is not None else None
+        })
+    
+    # Keyed on the resolved bitset, so equivalent spellings (true, TRUE, 1, "true,yes") share one entry
+    key = ("response", "filtered", matched, after, limit, projection)
+    return index.cached(key, build).respond(request)
+
 @app.get("/api/peptides")
-async def get_peptides():
-    """Get all peptide categories and peptides"""
+async def get_peptides(
+    request: Request,
+    fields: Optional[str] = None,
+    fda_approved: Optional[str] = Query(None, alias="fdaApproved"),
+    wada_banned: Optional[str] = Query(None, alias="wadaBanned"),
+    category: Optional[str] = None,
+    research_status: Optional[str] = Query(None, alias="researchStatus"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    lang: Optional[str] = None
+):
+    """Get all peptide categories and peptides, optionally projected to ``fields``
+    
+    Any filter (fdaApproved, wadaBanned, category, researchStatus) or pagination
+    parameter switches to a flat, cursor-paginated list of unique peptides.
+    ``lang`` serves the catalog from its pre-translated bundle (see locale_bundles.py).
+    """
     try:
-        categories = get_peptide_categories()
-        return categories
+        index = catalog_index_for(lang)
+        filters = {
+            "fdaApproved": fda_approved,
+            "wadaBanned": wada_banned,
+            "category": category,
+            "researchStatus": research_status
+        }
+        if any(value is not None for value in filters.values()) or cursor or limit:
+            return filtered_peptides_response(request, filters, cursor, limit or 50, fields, index)
+        return all_categories_response(request, fields, index)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching peptides: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching peptides")
 
 @app.get("/api/peptide-categories")
-async def get_peptide_categories_endpoint():
+async def get_peptide_categories_endpoint(request: Request, fields: Optional[str] = None):
     """Get all peptide categories and peptides (alias for /api/peptides)"""
     try:
-        categories = get_peptide_categories()
-        return categories
+        return all_categories_response(request, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching peptide categories: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching peptide categories")
 
 @app.get("/api/peptides/{slug}")
-async def get_peptide(slug: str):
+async def get_peptide(slug: str, fields: Optional[str] = None):
     """Get a specific peptide by slug"""
     try:
-        categories = get_peptide_categories()
-        
-        # Search through all categories for the peptide
-        for category_key, category in categories.items():
-            if 'peptides' in category:
-                for peptide in category['peptides']:
-                    if peptide.get('slug') == slug:
-                        return peptide
-        
-        raise HTTPException(status_code=404, detail="Peptide not found")
+        index = get_catalog_index()
+        projection = parse_catalog_fields(index, fields)
+        peptide = index.get_peptide(slug)
+        if peptide is None:
+            raise HTTPException(status_code=404, detail="Peptide not found")
+        return index.project_peptide(peptide, projection)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching peptide {slug}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching peptide")
 
+@app.get("/api/peptides/{slug}/dosing-profile")
+async def get_dosing_profile(slug: str):
+    """Dosing unit class and parsed dose range for a peptide, as used by the calculator"""
+    profile = get_catalog_index().dosing_profiles.get(slug.lower())
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Peptide not found")
+    return profile._asdict()
+
+def parse_grid_axis(name: str, value: Optional[str], default: tuple) -> tuple:
+    """Parse a comma-separated grid axis, mapping bad input to a 400"""
+    if not value:
+        return tuple(float(item) for item in default)
+    try:
+        items = tuple(sorted({float(item) for item in value.split(",") if item.strip()}))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be comma-separated numbers")
+    low, high = GRID_AXIS_LIMITS[name]
+    in_range = all(math.isfinite(item) and low <= item <= high for item in items)
+    if not items or len(items) > MAX_GRID_AXIS or not in_range:
+        raise HTTPException(
+            status_code=400, detail=f"{name} needs 1-{MAX_GRID_AXIS} values between {low:g} and {high:g}"
+        )
+    return items
+
+@app.get("/api/peptides/{slug}/reconstitution-grid")
+async def get_reconstitution_grid(
+    request: Request,
+    slug: str,
+    vial_sizes: Optional[str] = None,
+    water_volumes: Optional[str] = None,
+    doses: Optional[str] = None
+):
+    """Get a precomputed reconstitution lookup table for a peptide"""
+    try:
+        index = get_catalog_index()
+        profile = index.dosing_profiles.get(slug.lower())
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Peptide not found")
+        
+        dosing_type = profile.unit_class
+        default_vials, default_waters, default_doses = DEFAULT_GRID_SPECS[dosing_type]
+        spec = (
+            parse_grid_axis("vial_sizes", vial_sizes, default_vials),
+            parse_grid_axis("water_volumes", water_volumes, default_waters),
+            parse_grid_axis("doses", doses, default_doses)
+        )
+        # Only default grids are cached; arbitrary custom axes would churn the cache
+        if spec != tuple(tuple(float(item) for item in axis) for axis in DEFAULT_GRID_SPECS[dosing_type]):
+            grid = await asyncio.to_thread(reconstitution_grid, dosing_type, *spec)
+            return {"peptide": slug.lower(), **grid}
+        cached = index.cached(
+            ("response", "reconstitution-grid", slug.lower(), spec),
+            lambda: CachedResponse({"peptide": slug.lower(), **reconstitution_grid(dosing_type, *spec)})
+        )
+        return cached.respond(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building reconstitution grid for {slug}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error building reconstitution grid")
+
 @app.get("/api/peptide-categories")
-async def get_all_peptide_categories():
+async def get_all_peptide_categories(request: Request, fields: Optional[str] = None):
     """Get all peptide categories"""
     try:
-        categories = get_peptide_categories()
-        return categories
+        return all_categories_response(request, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching peptide categories: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching categories")
 
 @app.get("/api/peptide-categories/{category}")
-async def get_peptide_category(category: str):
-    """Get a specific peptide category"""
+async def get_peptide_category(request: Request, category: str, fields: Optional[str] = None):
+    """Get a specific peptide category, optionally projected to ``fields``"""
     try:
-        categories = get_peptide_categories()
+        index = get_catalog_index()
+        projection = parse_catalog_fields(index, fields)
         
-        if category in categories:
-            return categories[category]
-        else:
+        if category not in index.categories:
             raise HTTPException(status_code=404, detail="Category not found")
+        
+        cached = index.cached(
+            ("response", "category", category, projection),
+            lambda: CachedResponse(index.project_category(index.categories[category], projection))
+        )
+        return cached.respond(request)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching category {category}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching category")
 
+@app.get("/api/search")
+async def search_peptides(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Full-text search over peptide descriptions, benefits, mechanisms and findings (BM25 ranked)"""
+    try:
+        results = get_search_index().search(q, limit)
+        return {"query": q, "results": results, "total": len(results)}
+    except Exception as e:
+        logger.error(f"Search error for {q!r}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Search failed")
+
 @app.post("/api/calculator/calculate")
 async def calculate_dosage(calc_input: CalculatorInput):
     """Universal calculator for all peptides"""
@@ -273,87 +525,31 @@ async def calculate_dosage(calc_input: CalculatorInput):
         
         # Get peptide information to determine calculation type
         peptide_slug = calc_input.peptide_slug.lower()
-        categories = get_peptide_categories()
-        
-        # Find the peptide in the database
-        peptide_info = None
-        for category_key, category in categories.items():
-            if 'peptides' in category:
-                for peptide in category['peptides']:
-                    if peptide.get('slug') == peptide_slug:
-                        peptide_info = peptide
-                        break
-                if peptide_info:
-                    break
+        index = get_catalog_index()
+        peptide_info = index.get_peptide(peptide_slug)
         
         if not peptide_info:
             raise HTTPException(status_code=404, detail="Peptide not found in database")
         
-        # Determine dosing type based on peptide characteristics
-        dosage_text = peptide_info.get('dosage', '').lower()
-        
-        # Check if peptide uses mcg dosing
-        is_mcg_dosing = (
-            'mcg' in dosage_text or 
-            'μg' in dosage_text or
-            peptide_slug in ['ipamorelin', 'igf-1-lr3', 'bpc-157', 'cjc-1295', 
-                           'ghrp-2', 'ghrp-6', 'hexarelin', 'melanotan-ii', 'ghk-cu', 
-                           'ahk-cu', 'dsip', 'selank', 'semax', 'mgf', 'ara-290'] or
-            any(keyword in peptide_slug for keyword in ['ghrp', 'igf', 'bpc', 'melanotan'])
-        )
-        
-        # Special handling for TB-500 (uses mg but smaller doses)
-        is_tb500_style = peptide_slug in ['tb-500', 'thymosin']
-        
-        if is_mcg_dosing:
-            # For mcg-based peptides (growth factors, healing peptides, etc.)
-            concentration_mg = calc_input.vial_size / calc_input.bacteriostatic_water
-            concentration_mcg = concentration_mg * 1000
-            injection_volume = calc_input.target_dose / concentration_mcg
-            doses_per_vial = int((calc_input.vial_size * 1000) / calc_input.target_dose)
-            
-            result = CalculatorResult(
-                concentration=round(concentration_mg, 3),
-                injection_volume=round(injection_volume, 4),
-                concentration_mcg=round(concentration_mcg, 0),
-                doses_per_vial=doses_per_vial
-            )
-        elif is_tb500_style:
-            # For TB-500 style peptides (mg dosing but smaller amounts)
-            concentration = calc_input.vial_size / calc_input.bacteriostatic_water
-            injection_volume = calc_input.target_dose / concentration
-            doses_per_vial = int(calc_input.vial_size / calc_input.target_dose)
-            
-            result = CalculatorResult(
-                concentration=round(concentration, 3),
-                injection_volume=round(injection_volume, 4),
-                doses_per_vial=doses_per_vial
-            )
-        else:
-            # For mg-based peptides (GLP-1 agonists, etc.)
-            concentration = calc_input.vial_size / calc_input.bacteriostatic_water
-            injection_volume = calc_input.target_dose / concentration
-            units_per_ml = concentration * 1000  # Convert to mcg/ml
-            doses_per_vial = int(calc_input.vial_size / calc_input.target_dose)
-            
-            result = CalculatorResult(
-                concentration=round(concentration, 3),
-                injection_volume=round(injection_volume, 4),
-                units_per_ml=round(units_per_ml, 0),
-                doses_per_vial=doses_per_vial
-            )
+        dosing_type = index.dosing_profiles[peptide_slug].unit_class
+        key = ("dosage", index.version, peptide_slug, calc_input.vial_size, calc_input.bacteriostatic_water,
+               calc_input.target_dose)
+        cached = calculator_cache.get_or_compute(key, lambda: CalculatorResult(**reconstitute(
+            calc_input.vial_size, calc_input.bacteriostatic_water, calc_input.target_dose, dosing_type
+        )).dict())
         
         # Store calculation in history
         calc_id = secrets.token_urlsafe(16)
-        calculation_history[calc_id] = {
+        result = {**cached, "calculation_id": calc_id}
+        await calculations.add(calc_id, {
             "timestamp": datetime.utcnow().isoformat(),
             "peptide": peptide_info.get('name'),
             "input": calc_input.dict(),
-            "result": result.dict(),
-            "dosing_type": "mcg" if is_mcg_dosing else ("mg-small" if is_tb500_style else "mg")
-        }
+            "result": result,
+            "dosing_type": dosing_type
+        })
         
-        logger.info(f"Universal calculation completed for {peptide_info.get('name')}: {result.dict()}")
+        logger.info(f"Universal calculation completed for {peptide_info.get('name')}: {calc_id}")
         return result
         
     except HTTPException:
@@ -362,93 +558,89 @@ async def calculate_dosage(calc_input: CalculatorInput):
         logger.error(f"Universal calculation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Calculation failed")
 
+MAX_CALCULATION_BATCH = 1000
+
+@app.post("/api/calculator/calculate-batch")
+async def calculate_dosage_batch(calc_inputs: List[CalculatorInput]):
+    """Run many reconstitution calculations, with a result or an error per item"""
+    if len(calc_inputs) > MAX_CALCULATION_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CALCULATION_BATCH} calculations per batch")
+    try:
+        index = get_catalog_index()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calc_inputs)
+        valid = []
+        for position, calc_input in enumerate(calc_inputs):
+            if calc_input.vial_size <= 0 or calc_input.bacteriostatic_water <= 0 or calc_input.target_dose <= 0:
+                results[position] = {"error": "All values must be greater than 0", "status_code": 400}
+                continue
+            peptide_slug = calc_input.peptide_slug.lower()
+            profile = index.dosing_profiles.get(peptide_slug)
+            if profile is None:
+                results[position] = {"error": "Peptide not found in database", "status_code": 404}
+                continue
+            valid.append((position, calc_input, profile.unit_class))
+
+        if valid:
+            computed = reconstitute_many(
+                [calc_input.vial_size for _, calc_input, _ in valid],
+                [calc_input.bacteriostatic_water for _, calc_input, _ in valid],
+                [calc_input.target_dose for _, calc_input, _ in valid],
+                [dosing_type for _, _, dosing_type in valid]
+            )
+            for (position, _, _), result in zip(valid, computed):
+                results[position] = result if result is not None else {
+                    "error": "Values are out of range", "status_code": 400
+                }
+
+        errors = sum(1 for result in results if "error" in result)
+        logger.info(f"Batch calculation completed: {len(results) - errors} of {len(calc_inputs)} succeeded")
+        return {"results": results, "count": len(results), "errors": errors}
+
+    except Exception as e:
+        logger.error(f"Batch calculation error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Batch calculation failed")
+
+@app.get("/api/calculations/{calc_id}")
+async def get_calculation(calc_id: str):
+    """Fetch a stored dosage calculation by the id returned from /api/calculator/calculate"""
+    record = await calculations.get(calc_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Calculation not found or expired")
+    return {"calculation_id": calc_id, **record}
+
+@app.get("/api/calculators/melanotan-pro/table")
+async def get_melanotan_table(request: Request):
+    """Every valid melanotan protocol, keyed by peptide|fitzpatrick_scale|uv_exposure|sensitivity|target_tan"""
+    global melanotan_table_response
+    if melanotan_table_response is None:
+        melanotan_table_response = CachedResponse(melanotan_table.export())
+    return melanotan_table_response.respond(request)
+
 @app.post("/api/calculators/melanotan-pro", response_model=MelanotanResult)
 async def calculate_melanotan_protocol(melanotan_input: MelanotanCalculatorInput):
     """Calculate personalized melanotan dosing protocol"""
     try:
-        calculation_id = secrets.token_hex(8)
-        
-        # Base dosing parameters for different peptides
-        base_doses = {
-            "mt1": {"loading": 500, "maintenance": 250},  # mcg
-            "mt2": {"loading": 250, "maintenance": 125}   # mcg
-        }
-        
-        # Fitzpatrick scale multipliers (higher skin types need less)
-        fitzpatrick_multipliers = {1: 1.2, 2: 1.1, 3: 1.0, 4: 0.9, 5: 0.8, 6: 0.7}
-        
-        # UV exposure adjustments
-        uv_adjustments = {"minimal": 1.0, "moderate": 0.9, "frequent": 0.8}
-        
-        # Sensitivity adjustments
-        sensitivity_adjustments = {"high": 0.7, "normal": 1.0, "low": 1.2}
-        
-        # Target tan timeline
-        target_timelines = {"light": 14, "medium": 21, "dark": 35}
-        
-        # Get base doses for peptide type
-        peptide_doses = base_doses.get(melanotan_input.peptide, base_doses["mt2"])
-        
-        # Calculate adjusted doses
-        multiplier = (fitzpatrick_multipliers.get(melanotan_input.fitzpatrick_scale, 1.0) * 
-                     uv_adjustments.get(melanotan_input.uv_exposure, 1.0) * 
-                     sensitivity_adjustments.get(melanotan_input.sensitivity, 1.0))
-        
-        loading_dose = int(peptide_doses["loading"] * multiplier)
-        maintenance_dose = int(peptide_doses["maintenance"] * multiplier)
-        
-        # Generate loading schedule
-        loading_schedule = []
-        loading_duration = 7 if melanotan_input.peptide == "mt1" else 5
-        for day in range(1, loading_duration + 1):
-            dose_for_day = loading_dose if day <= 3 else int(loading_dose * 0.8)
-            loading_schedule.append({
-                "day": day,
-                "dose": dose_for_day,
-                "notes": "Loading phase" if day <= 3 else "Tapering"
-            })
-        
-        # Safety warnings and red flags
-        red_flags = []
-        safety_warnings = [
-            "Always use sterile injection technique",
-            "Monitor all moles and skin changes closely", 
-            "Use broad-spectrum sunscreen (SPF 30+)",
-            "Start with lower doses to assess tolerance",
-            "Discontinue if unusual skin changes occur"
-        ]
-        
-        # Add red flags for high-risk combinations
-        if melanotan_input.fitzpatrick_scale <= 2 and melanotan_input.target_tan == "dark":
-            red_flags.append("EXTREME CAUTION: Fair skin + dark tan target significantly increases cancer risk")
-        
-        if melanotan_input.peptide == "mt2" and melanotan_input.sensitivity == "high":
-            red_flags.append("MT-2 with high sensitivity may cause severe nausea and flushing")
-        
-        # Timeline calculation
-        timeline_days = target_timelines.get(melanotan_input.target_tan, 21)
-        if melanotan_input.fitzpatrick_scale <= 2:
-            timeline_days += 7  # Fair skin takes longer
-        
-        result = MelanotanResult(
-            loading_phase=MelanotanPhase(
-                daily_dose=loading_dose,
-                duration=loading_duration,
-                schedule=loading_schedule
-            ),
-            maintenance_phase=MelanotanPhase(
-                dose=maintenance_dose,
-                frequency="2-3 times per week"
-            ),
-            timeline=MelanotanTimeline(
-                estimated_days_to_target=timeline_days
-            ),
-            red_flags=red_flags,
-            safety_warnings=safety_warnings,
-            calculation_id=calculation_id
+        body = melanotan_table.response_body(
+            (melanotan_input.peptide, melanotan_input.fitzpatrick_scale, melanotan_input.uv_exposure,
+             melanotan_input.sensitivity, melanotan_input.target_tan),
+            secrets.token_hex(8)
         )
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+        
+        # Inputs outside the table fall back to the calculator's defaults for unknown values
+        key = ("melanotan", melanotan_input.peptide, melanotan_input.fitzpatrick_scale, melanotan_input.uv_exposure,
+               melanotan_input.sensitivity, melanotan_input.target_tan)
+        cached = calculator_cache.get_or_compute(key, lambda: MelanotanResult(
+            **melanotan_protocol(
+                melanotan_input.peptide, melanotan_input.fitzpatrick_scale, melanotan_input.uv_exposure,
+                melanotan_input.sensitivity, melanotan_input.target_tan
+            ),
+            calculation_id=""
+        ).dict(exclude={"calculation_id"}))
         
-        return result
+        # Already validated against MelanotanResult when cached; skip re-validating per request
+        return JSONResponse({**cached, "calculation_id": secrets.token_hex(8)})
         
     except Exception as e:
         logger.error(f"Melanotan calculation error: {str(e)}")
@@ -465,87 +657,17 @@ async def calculate_bmi(bmi_input: BMICalculatorInput):
         if bmi_input.sex not in ['male', 'female']:
             raise HTTPException(status_code=400, detail="Sex must be 'male' or 'female'")
         
-        # Calculate BMI
-        height_m = bmi_input.height_cm / 100
-        bmi = bmi_input.weight_kg / (height_m ** 2)
-        
-        # Determine BMI category
-        if bmi < 18.5:
-            bmi_category = "Underweight"
-        elif bmi < 25:
-            bmi_category = "Normal weight"
-        elif bmi < 30:
-            bmi_category = "Overweight"
-        else:
-            bmi_category = "Obese"
-        
-        # Calculate BMR using Mifflin-St Jeor equation
-        if bmi_input.sex == 'male':
-            bmr = 10 * bmi_input.weight_kg + 6.25 * bmi_input.height_cm - 5 * bmi_input.age + 5
-        else:
-            bmr = 10 * bmi_input.weight_kg + 6.25 * bmi_input.height_cm - 5 * bmi_input.age - 161
-        
-        # Calculate TDEE based on activity level
-        activity_multipliers = {
-            'sedentary': 1.2,
-            'lightly_active': 1.375,
-            'moderately_active': 1.55,
-            'very_active': 1.725,
-            'extremely_active': 1.9
-        }
-        
-        activity_key = bmi_input.activity_level.lower().replace(' ', '_')
-        multiplier = activity_multipliers.get(activity_key, 1.55)  # Default to moderately active
-        tdee = bmr * multiplier
-        
-        # Calculate healthy weight range (BMI 18.5-24.9)
-        healthy_weight_min = 18.5 * (height_m ** 2)
-        healthy_weight_max = 24.9 * (height_m ** 2)
-        
-        # Generate warnings and recommendations
-        warnings = []
-        weekly_calorie_deficit = None
-        weeks_to_healthy_bmi = None
-        
-        if bmi < 18.5:
-            warnings.append("Underweight BMI may indicate nutritional deficiency. Consult healthcare provider.")
-        elif bmi >= 30:
-            warnings.append("Obese BMI increases health risks. Consider professional weight management support.")
-            # Calculate deficit to reach BMI 25
-            target_weight = 25 * (height_m ** 2)
-            weight_to_lose = bmi_input.weight_kg - target_weight
-            if weight_to_lose > 0:
-                weekly_calorie_deficit = 3500  # 1 lb per week
-                weeks_to_healthy_bmi = int((weight_to_lose * 2.2) * 1)  # Approximate weeks
-        elif bmi >= 25:
-            warnings.append("Overweight BMI may increase health risks. Consider gradual weight loss.")
-            target_weight = 24.9 * (height_m ** 2)
-            weight_to_lose = bmi_input.weight_kg - target_weight
-            if weight_to_lose > 0:
-                weekly_calorie_deficit = 2500  # 0.7 lb per week
-                weeks_to_healthy_bmi = int((weight_to_lose * 2.2) * 1.4)
-        
-        if bmi_input.age > 65:
-            warnings.append("For adults over 65, slightly higher BMI (23-30) may be protective.")
-        
-        if bmi_input.age < 18:
-            warnings.append("BMI calculations for individuals under 18 should use pediatric growth charts.")
+        key = ("bmi", bmi_input.age, bmi_input.sex, bmi_input.height_cm, bmi_input.weight_kg,
+               activity_key(bmi_input.activity_level))
+        cached = calculator_cache.get_or_compute(key, lambda: BMIResult(
+            **bmi_metrics(bmi_input.age, bmi_input.sex, bmi_input.height_cm, bmi_input.weight_kg,
+                          bmi_input.activity_level),
+            calculation_id=""
+        ).dict(exclude={"calculation_id"}))
         
         # Generate unique calculation ID
         calc_id = secrets.token_urlsafe(16)
-        
-        result = BMIResult(
-            bmi=round(bmi, 1),
-            bmi_category=bmi_category,
-            bmr=round(bmr, 0),
-            tdee=round(tdee, 0),
-            healthy_weight_min=round(healthy_weight_min, 1),
-            healthy_weight_max=round(healthy_weight_max, 1),
-            weekly_calorie_deficit=weekly_calorie_deficit,
-            weeks_to_healthy_bmi=weeks_to_healthy_bmi,
-            warnings=warnings,
-            calculation_id=calc_id
-        )
+        result = {**cached, "calculation_id": calc_id}
         
         logger.info(f"BMI calculation completed: {calc_id}")
         return result
@@ -556,27 +678,102 @@ async def calculate_bmi(bmi_input: BMICalculatorInput):
         logger.error(f"BMI calculation error: {str(e)}")
         raise HTTPException(status_code=500, detail="BMI calculation failed")
 
+# Largest cohort CSV accepted, to bound temporary disk use; uploads are spooled
+# to a temporary file past 1 MB
+BMI_COHORT_MAX_BYTES = int(os.environ.get("BMI_COHORT_MAX_BYTES", 50 * 1024 * 1024))
+
+@app.post("/api/calculators/bmi/cohort")
+async def calculate_bmi_cohort(request: Request):
+    """Calculate BMI, BMR, TDEE and healthy weight ranges for a CSV of people
+    
+    The request body is a CSV with age, sex, height_cm, weight_kg and
+    activity_level columns (others are echoed back). Results stream back as CSV,
+    computed in NumPy chunks, so memory use doesn't grow with the file.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > BMI_COHORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Cohort CSV must be at most {BMI_COHORT_MAX_BYTES} bytes")
+            # Past 1 MB this is a disk write, so keep it off the event loop
+            await asyncio.to_thread(upload.write, chunk)
+        upload.seek(0)
+        try:
+            reader = await asyncio.to_thread(open_cohort_csv, upload)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cohort CSV: {str(e)}")
+    except HTTPException:
+        upload.close()
+        raise
+    except Exception as e:
+        upload.close()
+        logger.error(f"BMI cohort upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail="BMI cohort calculation failed")
+    
+    logger.info(f"BMI cohort calculation started: {size} bytes")
+    return StreamingResponse(
+        stream_bmi_cohort(reader),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="bmi-cohort-results.csv"'},
+        background=BackgroundTask(upload.close)
+    )
+
+blog_summary_response = None
+
 @app.get("/api/blog")
-async def get_blog_posts():
-    """Get all blog posts with content"""
+async def get_blog_posts(request: Request, summary: bool = True, lang: Optional[str] = None):
+    """Get all blog posts
+    
+    By default only post metadata is returned; fetch bodies from /api/blog/{slug}/content.
+    ``summary=false`` keeps the old behaviour of inlining the first three posts' markdown.
+    ``lang`` serves translated metadata from its pre-translated bundle (bodies stay English).
+    """
+    global blog_summary_response
     try:
+        if lang and lang.lower() != "en":
+            bundle = locale_bundle_for(lang)
+            return bundle.index.cached(("response", "blog"), lambda: CachedResponse(bundle.blog)).respond(request)
+        
+        if summary:
+            if blog_summary_response is None:
+                blog_summary_response = CachedResponse(get_blog_metadata())
+            return blog_summary_response.respond(request)
+        
         blog_posts = get_default_blog_data()
         
         # Load content for the first 3 posts (our new comprehensive posts)
         for post in blog_posts[:3]:
-            content_file = f"/app/blog_content/{post['slug']}.md"
-            try:
-                with open(content_file, 'r', encoding='utf-8') as f:
-                    post['content'] = f.read()
-            except FileNotFoundError:
-                post['content'] = f"Content for {post['title']} is being prepared..."
+            content = await blog_content_cache.get(post['slug'])
+            post['content'] = content if content is not None else f"Content for {post['title']} is being prepared..."
         
         return blog_posts
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching blog posts: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch blog posts")
 
+@app.get("/api/blog/{slug}/content")
+async def get_blog_post_content(slug: str):
+    """Stream a blog post's markdown body in chunks"""
+    try:
+        chunks = await blog_content_cache.stream(slug)
+        if chunks is None:
+            raise HTTPException(status_code=404, detail="Blog post content not found")
+        return StreamingResponse(
+            chunks,
+            media_type="text/markdown; charset=utf-8",
+            headers={"Cache-Control": "public, max-age=300"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming blog post {slug}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch blog post content")
+
 @app.get("/api/blog/{slug}")
 async def get_blog_post(slug: str):
     """Get a specific blog post by slug"""
@@ -587,16 +784,9 @@ async def get_blog_post(slug: str):
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        # Load content for the first 3 posts (our new comprehensive posts)
-        if post['id'] <= 3:
-            content_file = f"/app/blog_content/{post['slug']}.md"
-            try:
-                with open(content_file, 'r', encoding='utf-8') as f:
-                    post['content'] = f.read()
-            except FileNotFoundError:
-                post['content'] = f"Content for {post['title']} is being prepared..."
-        else:
-            post['content'] = f"Full content for {post['title']} is being prepared..."
+        # Load markdown content for every post that has a file in the content directory
+        content = await blog_content_cache.get(post['slug'])
+        post['content'] = content if content is not None else f"Full content for {post['title']} is being prepared..."
         
         return post
         
@@ -617,7 +807,8 @@ async def newsletter_signup(request: Request, signup: NewsletterSignup):
         email = signup.email.lower()
         
         # Check if already subscribed
-        if email in subscribers and subscribers[email].get('confirmed'):
+        existing = await subscribers.get(email)
+        if existing and existing.get('confirmed'):
             return {"message": "Email already subscribed", "status": "already_subscribed"}
         
         # Generate confirmation token
@@ -625,7 +816,7 @@ async def newsletter_signup(request: Request, signup: NewsletterSignup):
         expires_at = datetime.utcnow() + timedelta(hours=24)
         
         # Store pending subscription
-        subscribers[email] = {
+        await subscribers.add_pending({
             "email": email,
             "confirmation_token": confirmation_token,
             "expires_at": expires_at.isoformat(),
@@ -633,7 +824,7 @@ async def newsletter_signup(request: Request, signup: NewsletterSignup):
             "preferences": signup.preferences,
             "created_at": datetime.utcnow().isoformat(),
             "ip_address": client_ip[:8] + "..." if len(client_ip) > 8 else client_ip  # Partially masked IP
-        }
+        })
         
         # Send confirmation email
         try:
@@ -668,11 +859,10 @@ async def newsletter_signup(request: Request, signup: NewsletterSignup):
                 """
             }
             
-            resend.Emails.send(params)
-            logger.info(f"Confirmation email sent successfully to {email}")
+            email_queue.enqueue(params, kind="confirmation")
             
         except Exception as e:
-            logger.error(f"Failed to send confirmation email to {email}: {str(e)}")
+            logger.error(f"Failed to queue confirmation email to {email}: {str(e)}")
             # Don't fail the signup if email fails, just log it
         
         return {
@@ -689,11 +879,7 @@ async def confirm_newsletter(token: str):
     """Confirm newsletter subscription"""
     try:
         # Find subscriber by token
-        subscriber = None
-        for email, data in subscribers.items():
-            if data.get('confirmation_token') == token:
-                subscriber = data
-                break
+        subscriber = await subscribers.find_by_token(token)
         
         if not subscriber:
             raise HTTPException(status_code=404, detail="Invalid confirmation token")
@@ -703,9 +889,11 @@ async def confirm_newsletter(token: str):
         if datetime.utcnow() > expires_at:
             raise HTTPException(status_code=400, detail="Confirmation token expired")
         
-        # Confirm subscription
-        subscriber['confirmed'] = True
-        subscriber['confirmed_at'] = datetime.utcnow().isoformat()
+        # Confirm subscription (this also retires the token)
+        subscriber = await subscribers.confirm(subscriber['email'], datetime.utcnow())
+        if subscriber is None:
+            # Purged as expired between the token lookup and the update
+            raise HTTPException(status_code=400, detail="Invalid or expired confirmation token")
         
         # Send welcome email
         try:
@@ -743,11 +931,10 @@ async def confirm_newsletter(token: str):
                 """
             }
             
-            resend.Emails.send(params)
-            logger.info(f"Welcome email sent to {subscriber['email']}")
+            email_queue.enqueue(params, kind="welcome")
             
         except Exception as e:
-            logger.error(f"Failed to send welcome email: {str(e)}")
+            logger.error(f"Failed to queue welcome email: {str(e)}")
         
         return {
             "message": "Subscription confirmed successfully!",
@@ -783,10 +970,10 @@ async def contact_form(form: ContactForm):
                 """
             }
             
-            resend.Emails.send(params)
+            email_queue.enqueue(params, kind="contact notification")
             
         except Exception as e:
-            logger.error(f"Failed to send contact form notification: {str(e)}")
+            logger.error(f"Failed to queue contact form notification: {str(e)}")
         
         return {"message": "Contact form submitted successfully"}
         
@@ -1000,41 +1187,28 @@ async def login(user_login: UserLogin):
         "note": "This is a placeholder endpoint for future functionality"
     }
 
+async def translate_miss(text: str, target_lang: str) -> Dict[str, Any]:
+    """Translate one text the cache doesn't have, batched with concurrent misses"""
+    if not deepl_client.configured:
+        raise HTTPException(status_code=500, detail="Translation API key not configured")
+    try:
+        return await translation_batcher.translate(text, target_lang)
+    except DeepLError as e:
+        logger.error(f"DeepL API error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Translation service error")
+
 @app.post("/api/translate")
 async def translate_text(request: TranslateRequest):
-    """Translate text using DeepL API"""
+    """Translate text using DeepL API, serving repeated translations from the cache
+    
+    Multi-sentence text is split into sentence segments (see translation_segments.py)
+    that act as a translation memory: only segments not translated before go to
+    DeepL, concurrently and in batches, and the result is reassembled in order.
+    """
     try:
-        # Get DeepL API key from environment
-        deepl_api_key = os.environ.get("DEEPL_API_KEY")
-        testsprite_api_key = os.environ.get("TESTSPRITE_API_KEY")
-        
-        if not deepl_api_key and not testsprite_api_key:
-            raise HTTPException(status_code=500, detail="Translation API key not configured")
-        
-        # Use available API key (prefer DeepL if both available)
-        api_key = deepl_api_key or testsprite_api_key
+        translation = await translate_segmented(request.text, request.target_lang, translation_cache, translate_miss)
+        return {"translations": [translation]}
         
-        # Call DeepL API
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api-free.deepl.com/v2/translate",
-                headers={
-                    "Authorization": f"DeepL-Auth-Key {api_key}",
-                    "Content-Type": "application/x-www-form-urlencoded"
-                },
-                data={
-                    "text": request.text,
-                    "target_lang": request.target_lang.upper()
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"DeepL API error: {response.status_code} - {response.text}")
-                raise HTTPException(status_code=500, detail="Translation service error")
-            
-            translation_data = response.json()
-            return translation_data
-            
     except HTTPException:
         raise
     except Exception as e:
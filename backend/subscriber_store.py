@@ -0,0 +1,280 @@
+"""
+Newsletter subscriber storage for Peptide Professor API
+
+Both stores share one async interface. SUBSCRIBER_STORE picks the backend:
+``sqlite`` (default, persistent and shared by every worker on the host) or
+``memory`` (process-local, lost on restart).
+"""
+import asyncio
+import heapq
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBSCRIBER_DB_PATH = Path(__file__).resolve().parent / "data" / "subscribers.sqlite3"
+
+
+class SubscriberStore:
+    """Subscribers keyed by email, with a token index and an expiry heap for pending signups
+
+    ``email_by_token`` is kept in step with ``subscribers`` so confirmation is a
+    dictionary lookup. Every pending signup also goes on a min-heap ordered by
+    expiry; ``purge_expired`` pops it to drop signups that were never confirmed.
+    Heap entries are invalidated lazily: an entry whose token no longer matches
+    the subscriber's current token (re-signup or confirmation) is skipped.
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[str, Dict[str, Any]] = {}
+        self.email_by_token: Dict[str, str] = {}
+        self.expiry_heap: List[Tuple[datetime, str, str]] = []
+
+    async def get(self, email: str) -> Optional[Dict[str, Any]]:
+        return self.subscribers.get(email)
+
+    async def add_pending(self, record: Dict[str, Any]) -> None:
+        """Store (or replace) a pending signup; ``record`` needs email, confirmation_token and expires_at"""
+        email = record['email']
+        previous = self.subscribers.get(email)
+        if previous is not None:
+            self.email_by_token.pop(previous.get('confirmation_token'), None)
+
+        self.subscribers[email] = record
+        self.email_by_token[record['confirmation_token']] = email
+        heapq.heappush(
+            self.expiry_heap,
+            (datetime.fromisoformat(record['expires_at']), email, record['confirmation_token'])
+        )
+
+    async def find_by_token(self, token: str) -> Optional[Dict[str, Any]]:
+        email = self.email_by_token.get(token)
+        return self.subscribers.get(email) if email is not None else None
+
+    async def confirm(self, email: str, confirmed_at: datetime) -> Optional[Dict[str, Any]]:
+        """Mark a subscriber confirmed and retire their confirmation token; None if they were purged meanwhile"""
+        subscriber = self.subscribers.get(email)
+        if subscriber is None:
+            return None
+        subscriber['confirmed'] = True
+        subscriber['confirmed_at'] = confirmed_at.isoformat()
+        self.email_by_token.pop(subscriber.get('confirmation_token'), None)
+        return subscriber
+
+    async def purge_expired(self, now: datetime) -> int:
+        """Remove pending signups whose token expired before ``now``; returns how many were removed"""
+        removed = 0
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            _, email, token = heapq.heappop(self.expiry_heap)
+            subscriber = self.subscribers.get(email)
+            if subscriber is None or subscriber.get('confirmed') or subscriber.get('confirmation_token') != token:
+                continue
+            del self.subscribers[email]
+            self.email_by_token.pop(token, None)
+            removed += 1
+        return removed
+
+    async def count(self) -> int:
+        return len(self.subscribers)
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteSubscriberStore:
+    """Subscribers in a WAL-mode SQLite file, behind a small async connection pool
+
+    Reads borrow one of ``readers`` connections and run in a worker thread. Writes
+    are funnelled through a single writer task that groups whatever arrives within
+    ``batch_window`` seconds (up to ``batch_size`` writes) into one transaction, so
+    a burst of signups shares one commit instead of paying one each. Each write
+    runs in its own savepoint, so one failing write doesn't abort its batch.
+    """
+
+    COLUMNS = (
+        "email", "confirmation_token", "expires_at", "confirmed", "preferences",
+        "created_at", "confirmed_at", "ip_address"
+    )
+
+    def __init__(self, path: str, readers: int = 4, batch_size: int = 128, batch_window: float = 0.002):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.writer = self._connect()
+        self.writer.executescript("""
+            CREATE TABLE IF NOT EXISTS subscribers (
+                email TEXT PRIMARY KEY,
+                confirmation_token TEXT,
+                expires_at TEXT NOT NULL,
+                confirmed INTEGER NOT NULL DEFAULT 0,
+                preferences TEXT NOT NULL DEFAULT '{}',
+                created_at TEXT NOT NULL,
+                confirmed_at TEXT,
+                ip_address TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS subscribers_token
+                ON subscribers (confirmation_token) WHERE confirmation_token IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS subscribers_pending_expiry
+                ON subscribers (expires_at) WHERE confirmed = 0;
+        """)
+        self.reader_connections = [self._connect() for _ in range(readers)]
+        self.reader_pool: Optional[asyncio.Queue] = None
+        self.write_queue: Optional[asyncio.Queue] = None
+        self.writer_task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _ensure_started(self) -> None:
+        # Queues and the writer task must be created inside the running event loop
+        if self.writer_task is None:
+            self.reader_pool = asyncio.Queue()
+            for connection in self.reader_connections:
+                self.reader_pool.put_nowait(connection)
+            self.write_queue = asyncio.Queue()
+            self.writer_task = asyncio.create_task(self._write_loop())
+
+    @classmethod
+    def _to_record(cls, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        record = dict(row)
+        record['confirmed'] = bool(record['confirmed'])
+        record['preferences'] = json.loads(record['preferences'] or '{}')
+        return record
+
+    async def _read(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        self._ensure_started()
+        connection = await self.reader_pool.get()
+        try:
+            return await asyncio.to_thread(operation, connection)
+        finally:
+            self.reader_pool.put_nowait(connection)
+
+    async def _write(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self.write_queue.put_nowait((operation, future))
+        return await future
+
+    async def _write_loop(self) -> None:
+        # A None on the queue (from close()) stops the loop once earlier writes are committed
+        stopping = False
+        while not stopping:
+            item = await self.write_queue.get()
+            if item is None:
+                return
+            batch = [item]
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self.write_queue.empty():
+                item = self.write_queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                results = await asyncio.to_thread(self._commit_batch, [operation for operation, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit_batch(self, operations: List[Callable[[sqlite3.Connection], Any]]) -> List[Any]:
+        connection = self.writer
+        results: List[Any] = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for operation in operations:
+                connection.execute("SAVEPOINT write")
+                try:
+                    results.append(operation(connection))
+                    connection.execute("RELEASE write")
+                except Exception as e:
+                    connection.execute("ROLLBACK TO write")
+                    connection.execute("RELEASE write")
+                    results.append(e)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return results
+
+    async def get(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self._read(lambda connection: self._to_record(
+            connection.execute("SELECT * FROM subscribers WHERE email = ?", (email,)).fetchone()
+        ))
+
+    async def add_pending(self, record: Dict[str, Any]) -> None:
+        """Store (or replace) a pending signup; ``record`` needs email, confirmation_token and expires_at"""
+        values = dict(record, confirmed=int(record.get('confirmed', False)),
+                      preferences=json.dumps(record.get('preferences') or {}))
+        row = tuple(values.get(column) for column in self.COLUMNS)
+        await self._write(lambda connection: connection.execute(
+            f"INSERT INTO subscribers ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in self.COLUMNS)}) "
+            f"ON CONFLICT (email) DO UPDATE SET "
+            f"{', '.join(f'{column} = excluded.{column}' for column in self.COLUMNS[1:])}",
+            row
+        ))
+
+    async def find_by_token(self, token: str) -> Optional[Dict[str, Any]]:
+        return await self._read(lambda connection: self._to_record(
+            connection.execute("SELECT * FROM subscribers WHERE confirmation_token = ?", (token,)).fetchone()
+        ))
+
+    async def confirm(self, email: str, confirmed_at: datetime) -> Optional[Dict[str, Any]]:
+        """Mark a subscriber confirmed and retire their confirmation token; None if they were purged meanwhile"""
+        def operation(connection: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            connection.execute(
+                "UPDATE subscribers SET confirmed = 1, confirmed_at = ?, confirmation_token = NULL WHERE email = ?",
+                (confirmed_at.isoformat(), email)
+            )
+            return self._to_record(connection.execute("SELECT * FROM subscribers WHERE email = ?", (email,)).fetchone())
+
+        return await self._write(operation)
+
+    async def purge_expired(self, now: datetime) -> int:
+        """Remove pending signups whose token expired before ``now``; returns how many were removed"""
+        return await self._write(lambda connection: connection.execute(
+            "DELETE FROM subscribers WHERE confirmed = 0 AND expires_at <= ?", (now.isoformat(),)
+        ).rowcount)
+
+    async def count(self) -> int:
+        return await self._read(
+            lambda connection: connection.execute("SELECT COUNT(*) FROM subscribers").fetchone()[0]
+        )
+
+    async def close(self) -> None:
+        """Commit queued writes, stop the writer and close every connection"""
+        if self.writer_task is not None:
+            self.write_queue.put_nowait(None)
+            await self.writer_task
+            self.writer_task = None
+        for connection in [self.writer, *self.reader_connections]:
+            connection.close()
+
+
+def create_subscriber_store():
+    """Build the subscriber store selected by SUBSCRIBER_STORE / SUBSCRIBER_DB_PATH"""
+    backend = os.environ.get("SUBSCRIBER_STORE", "sqlite").lower()
+    if backend == "memory":
+        return SubscriberStore()
+    if backend != "sqlite":
+        logger.warning(f"Unknown SUBSCRIBER_STORE {backend!r}, using sqlite")
+    return SQLiteSubscriberStore(os.environ.get("SUBSCRIBER_DB_PATH", DEFAULT_SUBSCRIBER_DB_PATH))
@@ -0,0 +1,62 @@
+"""
+BMI cohort CSV processing, including rows whose numbers overflow
+
+Run from the backend directory:
+
+    python -m pytest tests
+"""
+import csv
+import io
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculators import bmi_metrics  # noqa: E402
+from cohort import OUT_OF_RANGE_ERROR, open_cohort_csv, stream_bmi_cohort  # noqa: E402
+
+HEADER = "id,age,sex,height_cm,weight_kg,activity_level\n"
+
+
+def run_cohort(rows):
+    source = io.BytesIO((HEADER + "".join(row + "\n" for row in rows)).encode("utf-8"))
+    output = b"".join(stream_bmi_cohort(open_cohort_csv(source))).decode("utf-8")
+    return list(csv.DictReader(io.StringIO(output)))
+
+
+def test_normal_rows_match_single_calculation():
+    results = run_cohort(["a,40,male,180,120,sedentary", "b,30,female,165,60,very active"])
+    for result, (age, sex, height, weight, activity) in zip(
+            results, [(40, "male", 180, 120, "sedentary"), (30, "female", 165, 60, "very active")]):
+        single = bmi_metrics(age, sex, height, weight, activity)
+        assert result["error"] == ""
+        assert float(result["bmi"]) == single["bmi"]
+        assert float(result["tdee"]) == single["tdee"]
+        expected_weeks = single["weeks_to_healthy_bmi"]
+        assert result["weeks_to_healthy_bmi"] == ("" if expected_weeks is None else str(expected_weeks))
+
+
+def test_extreme_weight_does_not_wrap_around():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        results = run_cohort(["a,40,male,180,1e25,sedentary", "b,40,male,180,1e300,sedentary",
+                              "c,40,male,180,1e308,sedentary", "d,40,male,180,120,sedentary"])
+    for result, weight in zip(results[:2], (1e25, 1e300)):
+        expected = bmi_metrics(40, "male", 180, weight, "sedentary")["weeks_to_healthy_bmi"]
+        assert result["error"] == ""
+        assert int(result["weeks_to_healthy_bmi"]) == expected > 0
+    assert results[2]["error"] == OUT_OF_RANGE_ERROR
+    assert results[2]["bmi"] == "" and results[2]["weeks_to_healthy_bmi"] == ""
+    assert results[3]["error"] == "" and results[3]["bmi"] != ""
+
+
+def test_extreme_height_is_a_row_error():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        results = run_cohort(["a,40,male,1e-300,80,sedentary", "b,40,female,1e300,80,sedentary",
+                              "c,40,female,165,60,sedentary"])
+    assert results[0]["error"] == OUT_OF_RANGE_ERROR
+    assert results[0]["bmi"] == ""
+    assert results[1]["error"] == OUT_OF_RANGE_ERROR
+    assert results[2]["error"] == "" and results[2]["bmi"] != ""
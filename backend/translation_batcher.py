@@ -0,0 +1,126 @@
+"""
+Single-flight coalescing and micro-batching of translations for Peptide Professor API
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Translator = Callable[[Sequence[str], str], Awaitable[List[Dict[str, Any]]]]
+
+# DeepL accepts up to 50 texts and 128 KiB of form data per request
+MAX_BATCH_TEXTS = 50
+MAX_BATCH_BYTES = 120 * 1024
+
+
+class TranslationBatcher:
+    """Turns concurrent single-text translation requests into few upstream calls
+
+    Identical requests already in flight share one future (single flight), so a
+    burst of browsers asking for the same string costs one translation. Distinct
+    texts for the same target language are held for up to ``window`` seconds and
+    sent together as one multi-``text`` request; a batch goes out early once it
+    reaches ``max_texts`` texts or ``max_bytes`` of text.
+
+    ``translate`` receives the texts and target language and must return one
+    translation object per text, in order (DeepLClient.translate does).
+    """
+
+    def __init__(self, translate: Translator, window: float = 0.005, max_texts: int = MAX_BATCH_TEXTS,
+                 max_bytes: int = MAX_BATCH_BYTES):
+        self.translate_batch = translate
+        self.window = window
+        self.max_texts = max_texts
+        self.max_bytes = max_bytes
+        self.in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # target language -> texts waiting for the next batch, and their total size
+        self.pending: Dict[str, List[str]] = {}
+        self.pending_bytes: Dict[str, int] = {}
+        self.flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self.batch_tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.texts_sent = 0
+
+    async def translate(self, text: str, target_lang: str) -> Dict[str, Any]:
+        """Translation object for one text, shared with identical concurrent requests"""
+        target_lang = target_lang.upper()
+        key = (target_lang, text)
+        self.requests += 1
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            # Callers may all give up; mark the outcome retrieved so it isn't logged as lost
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self.in_flight[key] = future
+            self._add_pending(text, target_lang)
+        # Shield so one caller being cancelled doesn't cancel the translation for everyone else
+        return await asyncio.shield(future)
+
+    def _add_pending(self, text: str, target_lang: str) -> None:
+        batch = self.pending.setdefault(target_lang, [])
+        batch.append(text)
+        self.pending_bytes[target_lang] = self.pending_bytes.get(target_lang, 0) + len(text.encode("utf-8"))
+        if len(batch) >= self.max_texts or self.pending_bytes[target_lang] >= self.max_bytes:
+            self._flush(target_lang)
+        elif target_lang not in self.flush_handles:
+            self.flush_handles[target_lang] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, target_lang
+            )
+
+    def _flush(self, target_lang: str) -> None:
+        handle = self.flush_handles.pop(target_lang, None)
+        if handle is not None:
+            handle.cancel()
+        texts = self.pending.pop(target_lang, [])
+        self.pending_bytes.pop(target_lang, None)
+        if texts:
+            task = asyncio.get_running_loop().create_task(self._send(texts, target_lang))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def _send(self, texts: List[str], target_lang: str) -> None:
+        self.batches += 1
+        self.texts_sent += len(texts)
+        try:
+            translations = await self.translate_batch(texts, target_lang)
+            if len(translations) != len(texts):
+                raise ValueError(f"Expected {len(texts)} translations, got {len(translations)}")
+        except asyncio.CancelledError:
+            for text in texts:
+                future = self.in_flight.pop((target_lang, text), None)
+                if future is not None:
+                    future.cancel()
+            raise
+        except Exception as e:
+            for text in texts:
+                future = self.in_flight.pop((target_lang, text), None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            logger.warning(f"Translation batch of {len(texts)} texts to {target_lang} failed: {str(e)}")
+            return
+        for text, translation in zip(texts, translations):
+            future = self.in_flight.pop((target_lang, text), None)
+            if future is not None and not future.done():
+                future.set_result(translation)
+
+    async def close(self) -> None:
+        """Send anything still waiting for its window and wait for in-flight batches"""
+        for target_lang in list(self.pending):
+            self._flush(target_lang)
+        if self.batch_tasks:
+            await asyncio.gather(*self.batch_tasks, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "texts_sent": self.texts_sent,
+            "average_batch_size": round(self.texts_sent / self.batches, 2) if self.batches else None,
+            "in_flight": len(self.in_flight)
+        }
@@ -0,0 +1,183 @@
+"""
+Content-addressed translation cache for Peptide Professor API
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def translation_key(text: str, target_lang: str) -> str:
+    """Content address of a translation: the same text and language always map to the same key"""
+    return hashlib.sha256(f"{target_lang.upper()}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Translations keyed by hash(text, target_lang), in a memory LRU over an optional SQLite tier
+
+    The memory tier holds ``max_entries`` translations, least recently used
+    evicted first. With ``path`` set, every translation is also written to a
+    WAL-mode SQLite file that survives restarts and is shared by every worker on
+    the host; memory misses fall through to it and are promoted on a hit. Disk
+    access runs in a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 10_000, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(str(path), timeout=10.0, isolation_level=None, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+            )
+
+    def _remember(self, key: str, translation: Dict[str, Any]) -> None:
+        self.entries[key] = translation
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write_disk(self, key: str, translation: Dict[str, Any]) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)",
+                (key, json.dumps(translation, ensure_ascii=False))
+            )
+
+    def _write_disk_many(self, rows: List[tuple]) -> None:
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany("INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)", rows)
+                self.connection.execute("COMMIT")
+            except Exception:
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+                raise
+
+    async def get(self, text: str, target_lang: str) -> Optional[Dict[str, Any]]:
+        """Cached DeepL translation object for ``text`` in ``target_lang``, or None"""
+        key = translation_key(text, target_lang)
+        translation = self.entries.get(key)
+        if translation is not None:
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return translation
+        if self.connection is not None:
+            try:
+                translation = await asyncio.to_thread(self._read_disk, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache read failed: {str(e)}")
+            if translation is not None:
+                self._remember(key, translation)
+                self.disk_hits += 1
+                return translation
+        self.misses += 1
+        return None
+
+    def _read_disk_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        with self.lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.connection.execute(
+                    f"SELECT key, value FROM translations WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+        return found
+
+    async def get_many(self, texts: Iterable[str], target_lang: str) -> Dict[str, Dict[str, Any]]:
+        """Cached translations for several texts at once, as {text: translation}; misses are left out
+
+        Memory misses are read from disk in one query rather than one thread hop per text.
+        """
+        keys = {text: translation_key(text, target_lang) for text in dict.fromkeys(texts)}
+        found = {}
+        for text, key in keys.items():
+            translation = self.entries.get(key)
+            if translation is not None:
+                self.entries.move_to_end(key)
+                self.memory_hits += 1
+                found[text] = translation
+        missing = {key: text for text, key in keys.items() if text not in found}
+        if missing and self.connection is not None:
+            try:
+                on_disk = await asyncio.to_thread(self._read_disk_many, list(missing))
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache read failed: {str(e)}")
+                on_disk = {}
+            for key, translation in on_disk.items():
+                self._remember(key, translation)
+                found[missing[key]] = translation
+            self.disk_hits += len(on_disk)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def put(self, text: str, target_lang: str, translation: Dict[str, Any]) -> None:
+        key = translation_key(text, target_lang)
+        self._remember(key, translation)
+        if self.connection is not None:
+            try:
+                await asyncio.to_thread(self._write_disk, key, translation)
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache write failed: {str(e)}")
+
+    async def put_many(self, texts: Iterable[str], target_lang: str, translations: Iterable[Dict[str, Any]]) -> None:
+        """Cache translations for several texts at once, written to disk in one transaction"""
+        rows = []
+        for text, translation in zip(texts, translations):
+            key = translation_key(text, target_lang)
+            self._remember(key, translation)
+            rows.append((key, json.dumps(translation, ensure_ascii=False)))
+        if rows and self.connection is not None:
+            try:
+                await asyncio.to_thread(self._write_disk_many, rows)
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache write failed: {str(e)}")
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "persistent": self.connection is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None
+        }
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def create_translation_cache() -> TranslationCache:
+    """Build the translation cache from TRANSLATION_CACHE_* environment variables"""
+    return TranslationCache(
+        max_entries=int(os.environ.get("TRANSLATION_CACHE_ENTRIES", 10_000)),
+        path=os.environ.get("TRANSLATION_CACHE_PATH") or None
+    )
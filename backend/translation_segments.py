@@ -0,0 +1,106 @@
+"""
+Sentence segmentation for translation memory in Peptide Professor API
+"""
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at . ! or ? (plus any closing quotes/brackets) followed by
+# whitespace and something that looks like the start of the next sentence
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])(["\')\]’”]*)(\s+)(?=["“‘(\[*_]?[A-Z0-9])')
+LINE_BREAK = re.compile(r'(\r?\n)')
+
+# Words whose trailing period doesn't end a sentence ("e.g. GLP-1", "Dr. Smith")
+ABBREVIATIONS = frozenset({'e.g.', 'i.e.', 'vs.', 'dr.', 'mr.', 'mrs.', 'ms.', 'prof.', 'st.', 'no.', 'fig.',
+                           'al.', 'approx.', 'ca.'})
+
+
+class Segment(NamedTuple):
+    """A piece of the source text; whitespace and markup-only pieces are kept as-is"""
+    text: str
+    translatable: bool
+
+
+def _is_translatable(text: str) -> bool:
+    return any(character.isalpha() for character in text)
+
+
+def _split_sentences(line: str) -> List[str]:
+    """Split one line into sentences and the whitespace between them, losslessly"""
+    pieces = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(line):
+        sentence_end = match.start(2)
+        last_word = line[start:match.start(1)].rsplit(None, 1)[-1].lower()
+        if last_word in ABBREVIATIONS or len(last_word) == 2 and last_word[0].isalpha():
+            continue
+        pieces.append(line[start:sentence_end])
+        pieces.append(match.group(2))
+        start = match.end(2)
+    pieces.append(line[start:])
+    return pieces
+
+
+def split_segments(text: str) -> List[Segment]:
+    """Cut text into sentence segments such that ``''.join(segment.text ...) == text``
+
+    Markdown is split line by line (headings, list items and paragraphs each
+    start new segments), then into sentences; table rows stay whole. Editing
+    one sentence therefore changes only that segment's translation-memory key.
+    """
+    segments = []
+    for line in LINE_BREAK.split(text):
+        if not line:
+            continue
+        stripped = line.strip()
+        if not _is_translatable(stripped):
+            segments.append(Segment(line, False))
+            continue
+        leading = line[:len(line) - len(line.lstrip())]
+        trailing = line[len(line.rstrip()):]
+        if leading:
+            segments.append(Segment(leading, False))
+        pieces = [stripped] if stripped.startswith('|') else _split_sentences(stripped)
+        segments.extend(Segment(piece, _is_translatable(piece)) for piece in pieces if piece)
+        if trailing:
+            segments.append(Segment(trailing, False))
+    return segments
+
+
+def join_segments(segments: List[Segment], translations: Dict[str, str]) -> str:
+    """Reassemble segmented text, substituting each translatable segment's translation"""
+    return ''.join(translations[segment.text] if segment.translatable else segment.text for segment in segments)
+
+
+async def translate_segmented(text: str, target_lang: str, memory,
+                              translate: Callable[[str, str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Translate ``text`` segment by segment over a translation memory
+
+    Every segment is looked up in ``memory`` (a TranslationCache) in one pass;
+    only the misses go to ``translate`` (one call per text, e.g.
+    TranslationBatcher.translate, which sends concurrent calls in batches), and the
+    translations are reassembled in order. Text with a single segment is looked up
+    and translated whole. Returns one DeepL-style translation object.
+    """
+    segments = split_segments(text)
+    texts = list(dict.fromkeys(segment.text for segment in segments if segment.translatable))
+    if len(texts) <= 1:
+        texts = [text]
+
+    translations = await memory.get_many(texts, target_lang)
+    missing = [segment_text for segment_text in texts if segment_text not in translations]
+    if missing:
+        translated = await asyncio.gather(*(translate(segment_text, target_lang) for segment_text in missing))
+        translations.update(zip(missing, translated))
+        if len(texts) > 1:
+            logger.info(f"Translated {len(missing)} of {len(texts)} segments to {target_lang}")
+
+    if texts == [text]:
+        return translations[text]
+    return {
+        "detected_source_language": translations[texts[0]].get("detected_source_language"),
+        "text": join_segments(segments, {source: translation["text"] for source, translation in translations.items()})
+    }
@@ -145,6 +145,22 @@ const fetchBlogPosts = async () => {
   }
 };
 
+const fetchMelanotanProtocols = async () => {
+  console.log('☀️  Fetching melanotan protocol table...');
+  try {
+    const response = await api.get('/calculators/melanotan-pro/table');
+    const table = response.data;
+    
+    // Every valid calculator input, so the melanotan calculator works offline
+    saveJsonData('melanotan-protocols.json', table);
+    console.log(`✅ Processed ${Object.keys(table.protocols || {}).length} melanotan protocols`);
+    return { success: true, count: Object.keys(table.protocols || {}).length };
+  } catch (error) {
+    console.error('❌ Failed to fetch melanotan protocols:', error.message);
+    return { success: false, error: error.message };
+  }
+};
+
 // Generate calculator configurations
 const generateCalculatorConfigs = () => {
   console.log('🧮 Generating calculator configurations...');
@@ -587,7 +603,8 @@ const main = async () => {
         { name: 'Peptide Data', fn: fetchPeptideData },
         { name: 'Peptide Categories', fn: fetchPeptideCategories },
         { name: 'Team Members', fn: fetchTeamMembers },
-        { name: 'Blog Posts', fn: fetchBlogPosts }
+        { name: 'Blog Posts', fn: fetchBlogPosts },
+        { name: 'Melanotan Protocols', fn: fetchMelanotanProtocols }
       ];
       
       for (const task of tasks) {